@@ -0,0 +1,185 @@
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from MuleLines import GENERATOR_VERSION, MuleLines
+from SyntheticMuleConfig import SyntheticMuleConfig
+
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# Times each phase of the generator (parse, isolate, convert and write) on synthetic Mule configs of
+# several sizes, measures the peak memory of a whole run, and reports how each scales with the number of flows.
+# Results can be saved as a JSON baseline, and later runs compared against it to catch regressions.
+
+PHASES = ('parse', 'isolate', 'convert', 'write')
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+MIN_SECONDS = 0.1  # Phases faster than this varied by over 20% between identical runs
+MEGABYTE = 1024 * 1024
+
+# Run every phase on inputFile repeat times, and return the best time of each phase in seconds,
+# along with the number of Mule and MUnit TagPairs.
+def timePhases(inputFile : str, outputFile : str, repeat : int) -> dict:
+    best = dict.fromkeys(PHASES)
+    for _ in range(0, repeat):
+        mule = MuleLines()
+        times = {}
+
+        startTime = time.perf_counter()
+        mule.parseMuleFileLines(inputFile)
+        times['parse'] = time.perf_counter() - startTime
+
+        # createMUnitTests isolates the flows itself; its metrics time isolation apart from conversion
+        mule.createMUnitTests()
+        seconds = mule.metrics.seconds
+        times['isolate'] = seconds['isolate']
+        times['convert'] = seconds['convert'] + seconds['cache'] + seconds['expand']
+
+        startTime = time.perf_counter()
+        mule.createMUnitSuiteFile(outputFile)
+        times['write'] = time.perf_counter() - startTime
+
+        for phase in PHASES:
+            if best[phase] is None or times[phase] < best[phase]:
+                best[phase] = times[phase]
+
+    best['mulePairs'] = len(mule._muleTagList.tags())
+    best['munitPairs'] = len(mule._mUnitTagList.tags())
+    return best
+
+# Returns the peak number of bytes allocated while generating the suite for inputFile, from parsing to writing.
+# Measured on a run of its own, since tracing allocations slows down the timed runs.
+def measurePeakMemory(inputFile : str, outputFile : str) -> int:
+    tracemalloc.start()
+    try:
+        mule = MuleLines()
+        mule.parseMuleFileLines(inputFile)
+        mule.createMUnitTests()
+        mule.createMUnitSuiteFile(outputFile)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+# Returns the exponent k for which time grows as flows^k between two scales, or None if either time is 0.
+def scalingExponent(smallFlows : int, smallTime : float, largeFlows : int, largeTime : float) -> float:
+    if smallTime <= 0 or largeTime <= 0 or smallFlows == largeFlows:
+        return None
+    return math.log(largeTime / smallTime) / math.log(largeFlows / smallFlows)
+
+# Print a table of phase times and peak memory for each scale, followed by the scaling exponent of each.
+def printResults(results : dict) -> None:
+    scales = sorted(results, key = int)
+    print('%8s %10s' % ('flows', 'pairs') + ''.join('%12s' % phase for phase in PHASES) + '%12s' % 'peak memory')
+    for scale in scales:
+        result = results[scale]
+        print('%8s %10d' % (scale, result['mulePairs']) + ''.join('%11.4fs' % result[phase] for phase in PHASES)
+              + '%10.1fMB' % (result['peakMemory'] / MEGABYTE))
+
+    if len(scales) > 1:  # 1.0 means linear growth
+        smallest, largest = results[scales[0]], results[scales[-1]]
+        exponents = [scalingExponent(int(scales[0]), smallest[measure], int(scales[-1]), largest[measure])
+                     for measure in PHASES + ('peakMemory',)]
+        print('%19s' % 'scaling exponent' + ''.join('%12s' % ('-' if exponent is None else '%.2f' % exponent)
+                                                    for exponent in exponents))
+
+# Compare results against a baseline, printing every phase which is more than threshold slower, and every
+# peak memory which is more than threshold larger.
+# Phases faster than minSeconds in the baseline are skipped, since they are dominated by noise.
+# Returns the number of regressions.
+def compareResults(results : dict, baseline : dict, threshold : float, minSeconds : float) -> int:
+    regressions = 0
+    for scale in sorted(results, key = int):
+        if scale not in baseline:
+            print('No baseline for ' + scale + ' flows; skipped')
+            continue
+
+        for phase in PHASES:
+            baselineTime = baseline[scale][phase]
+            currentTime = results[scale][phase]
+            if baselineTime < minSeconds:
+                continue
+
+            change = currentTime / baselineTime - 1
+            status = 'REGRESSION' if change > threshold else 'ok'
+            if change > threshold:
+                regressions += 1
+            print('%8s flows %-8s %9.4fs -> %9.4fs  %+6.1f%%  %s' % (scale, phase, baselineTime, currentTime,
+                                                                    change * 100, status))
+
+        if 'peakMemory' not in baseline[scale]:  # Recorded before peak memory was measured
+            continue
+        baselineMemory = baseline[scale]['peakMemory']
+        currentMemory = results[scale]['peakMemory']
+        change = currentMemory / baselineMemory - 1
+        status = 'REGRESSION' if change > threshold else 'ok'
+        if change > threshold:
+            regressions += 1
+        print('%8s flows %-8s %8.1fMB -> %8.1fMB  %+6.1f%%  %s' % (scale, 'memory', baselineMemory / MEGABYTE,
+                                                                  currentMemory / MEGABYTE, change * 100, status))
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description = 'Time the parse, isolate, convert and write phases, and measure peak memory.')
+    parser.add_argument('--flows', default = '50,200,800', help = 'Comma separated flow counts to run')
+    parser.add_argument('--flow-length', type = int, default = 10, help = 'Message processors per flow')
+    parser.add_argument('--branches', type = int, default = 3, help = 'Choice branches per flow; 0 for none')
+    parser.add_argument('--db-density', type = float, default = 0.2, help = 'Share of processors which are DB operations')
+    parser.add_argument('--ftp-density', type = float, default = 0.05, help = 'Share of processors which are FTP endpoints')
+    parser.add_argument('--flow-ref-density', type = float, default = 0.2, help = 'Share of processors which are flow-refs')
+    parser.add_argument('--repeat', type = int, default = 5, help = 'Runs per scale; the best time of each phase is kept')
+    parser.add_argument('--save', help = 'Write the results to this JSON baseline file')
+    parser.add_argument('--compare', nargs = '?', const = BASELINE_FILE,
+                        help = 'Compare the results against this JSON baseline file (default: the committed baseline.json)')
+    parser.add_argument('--threshold', type = float, default = 0.2,
+                        help = 'Slowdown or memory growth, as a fraction, above which a measure is flagged as a regression')
+    parser.add_argument('--min-seconds', type = float, default = MIN_SECONDS,
+                        help = 'Baseline phases faster than this are not compared, since they are dominated by noise '
+                        '(default: %g)' % MIN_SECONDS)
+    args = parser.parse_args()
+
+    workload = None
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        inputFile = os.path.join(directory, 'synthetic.xml')
+        outputFile = os.path.join(directory, 'synthetic-test-suite.xml')
+        for flowCount in [int(flows) for flows in args.flows.split(',')]:
+            config = SyntheticMuleConfig(flowCount, args.flow_length, args.branches, args.db_density,
+                                         args.ftp_density, args.flow_ref_density)
+            config.write(inputFile)
+            workload = config.parameters()
+            results[str(flowCount)] = timePhases(inputFile, outputFile, args.repeat)
+            results[str(flowCount)]['peakMemory'] = measurePeakMemory(inputFile, outputFile)
+
+    printResults(results)
+    del workload['flowCount']  # Stored per result instead
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump({'generatorVersion': GENERATOR_VERSION, 'python': platform.python_version(),
+                       'workload': workload, 'results': results}, file, indent = 2)
+        print('Saved baseline to ' + args.save)
+
+    if args.compare:
+        with open(args.compare, 'r') as file:
+            baseline = json.load(file)
+        print('Compared with ' + args.compare + ' (generator ' + baseline.get('generatorVersion', '?') + '):')
+        if baseline.get('workload') != workload:
+            print('Warning: the baseline was recorded with a different workload: ' + str(baseline.get('workload')))
+        regressions = compareResults(results, baseline['results'], args.threshold, args.min_seconds)
+        if regressions:
+            print('FAIL: ' + str(regressions) + ' measure(s) regressed by more than '
+                  + str(round(args.threshold * 100)) + '%')
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import random
+
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# Generates Mule configs of a chosen shape for benchmarking: the number of flows, the number of message
+# processors in each flow, the number of branches of each flow's choice block, and the share of processors
+# which are DB operations, FTP endpoints and flow-refs. The remaining processors are loggers and variables.
+# Configs are written with one tag per line, and are the same for the same parameters and seed.
+class SyntheticMuleConfig:
+    DB_OPERATIONS = ('db:select', 'db:insert', 'db:update', 'db:delete')
+
+    # Initialize a config of flowCount flows, each holding flowLength message processors and, if
+    # choiceBranches is above 0, a choice block with that many when/otherwise branches.
+    # The densities are the chance, from 0 to 1, of each processor being of that kind.
+    def __init__(self, flowCount : int, flowLength : int = 10, choiceBranches : int = 3, dbDensity : float = 0.2,
+                 ftpDensity : float = 0.05, flowRefDensity : float = 0.2, seed : int = 1) -> None:
+        if dbDensity + ftpDensity + flowRefDensity > 1:
+            raise ValueError('The DB, FTP and flow-ref densities must add up to at most 1')
+        self.flowCount = flowCount
+        self.flowLength = flowLength
+        self.choiceBranches = choiceBranches
+        self.dbDensity = dbDensity
+        self.ftpDensity = ftpDensity
+        self.flowRefDensity = flowRefDensity
+        self.seed = seed
+
+    # Returns the parameters of the config as a dict, e.g. for storing alongside benchmark results.
+    def parameters(self) -> dict:
+        return {'flowCount': self.flowCount, 'flowLength': self.flowLength, 'choiceBranches': self.choiceBranches,
+                'dbDensity': self.dbDensity, 'ftpDensity': self.ftpDensity, 'flowRefDensity': self.flowRefDensity,
+                'seed': self.seed}
+
+    # Returns the lines of the config.
+    def lines(self) -> []:
+        generator = random.Random(self.seed)
+        lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+                 '<mule xmlns="http://www.mulesoft.org/schema/mule/core" version="EE-3.7.3">']
+
+        for flowNumber in range(1, self.flowCount + 1):
+            name = 'orders-flow' + str(flowNumber)
+            lines.append('    <flow name="' + name + '" processingStrategy="synchronous">')
+            lines.append('        <http:listener config-ref="HTTP_Listener_Configuration" path="/api/orders/'
+                         + str(flowNumber) + '" doc:name="HTTP Listener"/>')
+            lines.append('        <set-payload value="#[message.inboundProperties.id]" doc:name="Set Original Payload"/>')
+
+            # Place the choice block, if any, in the middle of the flow
+            choicePosition = self.flowLength // 2 if self.choiceBranches > 0 else -1
+            for position in range(0, self.flowLength):
+                if position == choicePosition:
+                    self._appendChoice(lines, generator, '        ')
+                lines.append('        ' + self._processor(generator, flowNumber, position))
+
+            lines.append('        <set-payload value="#[\'done\']" doc:name="Set Response Payload"/>')
+            lines.append('    </flow>')
+
+        lines.append('</mule>')
+        return lines
+
+    # Write the config to filePath, and return the number of lines written.
+    def write(self, filePath : str) -> int:
+        lines = self.lines()
+        with open(filePath, 'w') as file:
+            file.write('\n'.join(lines) + '\n')
+        return len(lines)
+
+    # Append a choice block with choiceBranches branches, the last of which is the otherwise branch.
+    def _appendChoice(self, lines : [], generator : random.Random, indent : str) -> None:
+        lines.append(indent + '<choice doc:name="Route By Order Type">')
+        for branch in range(0, self.choiceBranches):
+            if branch == self.choiceBranches - 1 and branch > 0:
+                lines.append(indent + '    <otherwise>')
+                closingTag = '</otherwise>'
+            else:
+                lines.append(indent + '    <when expression="#[flowVars.orderType == \'type' + str(branch) + '\']">')
+                closingTag = '</when>'
+            lines.append(indent + '        ' + self._processor(generator, branch, 0))
+            lines.append(indent + '        <set-payload value="#[\'result ' + str(branch)
+                         + '\']" doc:name="Set Branch Payload"/>')
+            lines.append(indent + '    ' + closingTag)
+        lines.append(indent + '</choice>')
+
+    # Returns a random self closing message processor tag.
+    def _processor(self, generator : random.Random, flowNumber : int, position : int) -> str:
+        roll = generator.random()
+        if roll < self.dbDensity:
+            return ('<' + generator.choice(self.DB_OPERATIONS) + ' config-ref="Orders_Database"'
+                    ' source="#[payload]" doc:name="Database ' + str(position) + '"/>')
+        roll -= self.dbDensity
+        if roll < self.ftpDensity:
+            return ('<ftp:outbound-endpoint host="localhost" port="21" path="/orders"'
+                    ' outputPattern="order' + str(flowNumber) + '.json" doc:name="FTP"/>')
+        roll -= self.ftpDensity
+        if roll < self.flowRefDensity:
+            target = 'audit-subflow' if generator.random() < 0.5 else 'orders-flow' + str(generator.randint(1, 50))
+            return '<flow-ref name="' + target + '" doc:name="Call ' + target + '"/>'
+        if generator.random() < 0.5:
+            return ('<logger message="Step ' + str(position) + ' of #[flowVars.orderId]" level="INFO"'
+                    ' doc:name="Logger"/>')
+        return ('<set-variable variableName="step' + str(position) + '" value="#[payload]"'
+                ' doc:name="Variable"/>')
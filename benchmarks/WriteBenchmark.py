@@ -0,0 +1,139 @@
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from MuleLines import MuleLines
+from SuiteWriter import SuiteWriter
+from SyntheticMuleConfig import SyntheticMuleConfig
+
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# Compares SuiteWriter against the original string concatenation serializer on synthetic Mule configs of
+# several shapes, and on any configs given on the command line, and checks that both write the same suite
+# byte for byte.
+
+# Labels and shapes of the synthetic configs checked, as SyntheticMuleConfig arguments after the flow count.
+SHAPES = (
+    ('default', {}),
+    ('no choices', {'choiceBranches': 0}),
+    ('long flows, 6 branches', {'choiceBranches': 6, 'flowLength': 20}),
+    ('connector heavy', {'dbDensity': 0.5, 'ftpDensity': 0.3, 'flowRefDensity': 0.2}),
+)
+
+# The original serializer of MuleLines.createMUnitSuiteFile, kept here as the reference for the comparison.
+# Writes the XML for the TagPairs in pairs to file.
+def legacyWrite(pairs, file) -> None:
+    # Write initial XML definition tag to file
+    file.write('<?xml version="1.0" encoding="UTF-8"?>\n\n')
+    tagDepth = 0
+    testNumber = 1
+    currentFlow = ""
+
+    # Iterate through the TagPairs, create MUnit lines, and write them to the file.
+    for pair in pairs:
+        # Create a test number for flows with multiple test cases
+        if pair.getTag() == 'munit:test':
+            if currentFlow != pair.getAttribute('name'):
+                currentFlow = pair.getAttribute('name')
+                testNumber = 1
+
+            else:
+                testNumber += 1
+
+        # Create the MUnit file lines and write them to the output file.
+        mUnitLine = '<' + pair.getTag()
+        attributes = pair.getAttributes()
+        for attribute in pair.getAttributes():
+            if pair.getTag() == 'munit:test' and attribute == 'name':
+                mUnitLine = (mUnitLine + ' ' + attribute + '="' + attributes.get(attribute)
+                                + str(testNumber) + '"')
+
+            elif attribute != 'closeAtEnd':
+                mUnitLine = mUnitLine + ' ' + attribute + '="' + attributes.get(attribute) + '"'
+
+        # Add closing braces depending on the tag type
+        if pair.getAttribute('closeAtEnd'):
+                mUnitLine += '/>\n'
+
+        else:
+            mUnitLine += '>\n'
+
+        # Insert an additional newline for readability
+        if (pair.getTag() == '/munit:test' or pair.getTag() == '/spring:beans' or
+            pair.getTag() == '/munit:before-suite' or pair.getTag() == '/munit:after-suite'):
+            mUnitLine += '\n'
+
+        # Determine the indentation of current XML tag based on when blocks close
+        if pair.getTag()[0] != '/':
+            file.write('\t' * tagDepth + mUnitLine)
+
+        if pair.getTag()[0] == '/':
+            file.write('\t' * (tagDepth - 1) + mUnitLine)
+            tagDepth -= 1
+
+        elif not pair.getAttribute('closeAtEnd'):
+            tagDepth += 1
+
+# Returns the best time of repeat runs of write(pairs, stream), along with the text written by the last run.
+def timeWriter(write, pairs : [], repeat : int) -> (float, str):
+    best = None
+    text = None
+    for _ in range(0, repeat):
+        stream = io.StringIO()
+        startTime = time.perf_counter()
+        write(pairs, stream)
+        elapsed = time.perf_counter() - startTime
+        if best is None or elapsed < best:
+            best = elapsed
+        text = stream.getvalue()
+    return best, text
+
+# Returns the MUnit TagPairs generated for the Mule config at inputFilePath.
+def generatePairs(inputFilePath : str) -> []:
+    mule = MuleLines()
+    mule.parseMuleFileLines(inputFilePath)
+    mule.createMUnitTests()
+    return mule._mUnitTagList.pairs()
+
+# Compare both writers on the config at inputFilePath, print a result line, and return true if they match.
+def compareWriters(label : str, inputFilePath : str, repeat : int) -> bool:
+    pairs = generatePairs(inputFilePath)
+    legacyTime, legacyText = timeWriter(legacyWrite, pairs, repeat)
+    writerTime, writerText = timeWriter(SuiteWriter().write, pairs, repeat)
+    status = 'identical' if legacyText == writerText else 'DIFFERENT'
+    print('%-28s %9d %10.4fs %10.4fs %7.1fx  %s' % (label, len(pairs), legacyTime, writerTime,
+                                                  legacyTime / writerTime if writerTime else 0.0, status))
+    return legacyText == writerText
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description = 'Check SuiteWriter against the original serializer.')
+    parser.add_argument('configs', nargs = '*', help = 'Mule configs to check as well as the synthetic ones')
+    parser.add_argument('--flows', type = int, default = 200, help = 'Flows in each synthetic config')
+    parser.add_argument('--repeat', type = int, default = 3, help = 'Runs per writer; the best time is reported')
+    args = parser.parse_args()
+
+    print('%-28s %9s %11s %11s %8s' % ('config', 'pairs', 'legacy', 'SuiteWriter', 'speedup'))
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as directory:
+        inputFile = os.path.join(directory, 'synthetic.xml')
+        for label, shape in SHAPES:
+            SyntheticMuleConfig(args.flows, **shape).write(inputFile)
+            mismatches += not compareWriters(label, inputFile, args.repeat)
+
+    for inputFile in args.configs:
+        mismatches += not compareWriters(os.path.basename(inputFile), inputFile, args.repeat)
+
+    if mismatches:
+        print('FAIL: ' + str(mismatches) + ' suite(s) differ between the writers')
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
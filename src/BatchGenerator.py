@@ -0,0 +1,191 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from CoveragePlanner import CoveragePlanner
+from FlowCache import FlowCache
+from FlowIndex import FlowIndex
+from GenerationMetrics import GenerationMetrics
+from MuleLines import MuleLines
+from MuleParser import MuleParser
+
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# Generates an MUnit suite for every Mule config found under a directory, one process per job.
+# Each input gets its own MuleLines pipeline, and its suite is written to the output directory under
+# the same relative path, named <config>-test-suite.xml.
+class BatchGenerator:
+    # Folder holding the Mule configs of a Mule project; searched instead of inputDir when present.
+    MULE_APP_FOLDER = os.path.join('src', 'main', 'app')
+    SUITE_SUFFIX = '-test-suite.xml'
+
+    # Initialize a batch over the files in inputDir matching the glob pattern.
+    # jobs is the number of worker processes; None uses one per CPU.
+    # cacheDir, if given, is a FlowCache folder shared by every worker; the project's FlowIndex is kept there too.
+    # flowsPerFile, if above 0, splits each suite into one file per flowsPerFile flows.
+    # shards, if above 0, instead spreads each suite's tests across up to shards cost-balanced files.
+    # coverage and maxTestsPerFlow choose the tests of flows with several or nested choice blocks; see MuleLines.
+    def __init__(self, inputDir : str, outputDir : str, pattern : str = '**/*.xml', jobs : int = None,
+                 cacheDir : str = None, cacheBytes : int = FlowCache.DEFAULT_MAX_BYTES,
+                 flowsPerFile : int = 0, shards : int = 0, coverage : str = CoveragePlanner.DEFAULT_STRATEGY,
+                 maxTestsPerFlow : int = CoveragePlanner.DEFAULT_MAX_TESTS) -> None:
+        appDir = os.path.join(inputDir, self.MULE_APP_FOLDER)
+        self._inputDir = appDir if os.path.isdir(appDir) else inputDir
+        self._outputDir = outputDir
+        self._pattern = pattern
+        self._jobs = jobs if jobs else (os.cpu_count() or 1)
+        self._cacheDir = cacheDir
+        self._cacheBytes = cacheBytes
+        self._flowsPerFile = flowsPerFile
+        self._shards = shards
+        self._coverage = coverage
+        self._maxTestsPerFlow = maxTestsPerFlow
+        self.metrics = GenerationMetrics()  # Totals over every suite generated by run()
+        self._unchangedInputs = set()  # Configs whose output files all already held the generated suites
+
+    # Returns the sorted paths of every file under the input directory matching the glob pattern.
+    # When the output directory is inside the input directory, the suites written there are left out.
+    def findCandidateFiles(self) -> []:
+        paths = glob.glob(os.path.join(self._inputDir, self._pattern), recursive = True)
+        outputDir = os.path.abspath(self._outputDir)
+        if outputDir == os.path.abspath(self._inputDir) or not _isInside(outputDir, self._inputDir):
+            return sorted(path for path in paths if os.path.isfile(path))
+        return sorted(path for path in paths if os.path.isfile(path) and not _isInside(path, outputDir))
+
+    # Returns the sorted paths of every Mule config under the input directory.
+    # Files whose root element is not <mule> (e.g. log4j2.xml) and MUnit suites are skipped.
+    def findMuleConfigs(self) -> []:
+        return [path for path in self.findCandidateFiles() if isMuleConfig(path)]
+
+    # Bring flowIndex up to date with every Mule config under the input directory except the files at
+    # excludedFiles, save it, and return the configs' paths. The scan is timed as the 'index' phase of
+    # metrics, and the configs read are counted.
+    def updateFlowIndex(self, flowIndex : FlowIndex, metrics : GenerationMetrics, excludedFiles : [] = ()) -> []:
+        with metrics.phase('index'):
+            excludedFiles = {os.path.abspath(path) for path in excludedFiles}
+            configs = [path for path in self.findCandidateFiles()
+                       if os.path.abspath(path) not in excludedFiles and isMuleConfig(path)]
+            flowIndex.update(configs)
+            flowIndex.save()
+        metrics.count('configsIndexed', flowIndex.filesScanned)
+        return configs
+
+    # Returns the path of the suite generated for inputFilePath.
+    def outputPathFor(self, inputFilePath : str) -> str:
+        relativePath = os.path.relpath(inputFilePath, self._inputDir)
+        return os.path.join(self._outputDir, os.path.splitext(relativePath)[0] + self.SUITE_SUFFIX)
+
+    # Generate a suite for every Mule config and return a list of
+    # (inputFilePath, outputFilePath, seconds, error) tuples in input order.
+    # error is None for suites which were written successfully.
+    # The metrics of every worker are added to self.metrics.
+    def run(self) -> []:
+        # Index every flow of the project once, so each worker can resolve flow-refs to other configs
+        flowIndex = FlowIndex.forCacheDir(self._cacheDir)
+        inputFiles = self.updateFlowIndex(flowIndex, self.metrics)
+        outputFiles = [self.outputPathFor(inputFile) for inputFile in inputFiles]
+        cacheDirs = [self._cacheDir] * len(inputFiles)
+        flowsPerFile = [self._flowsPerFile] * len(inputFiles)
+        shards = [self._shards] * len(inputFiles)
+
+        if self._jobs == 1 or len(inputFiles) <= 1:  # Skip the process pool start-up cost
+            _initializeWorker(flowIndex, self._coverage, self._maxTestsPerFlow)
+            workerResults = list(map(_generateSuite, inputFiles, outputFiles, cacheDirs, flowsPerFile, shards))
+        else:
+            # The index and coverage options are sent to each worker process once, rather than with every config
+            with ProcessPoolExecutor(max_workers = self._jobs, initializer = _initializeWorker,
+                                     initargs = (flowIndex, self._coverage, self._maxTestsPerFlow)) as executor:
+                workerResults = list(executor.map(_generateSuite, inputFiles, outputFiles, cacheDirs,
+                                                  flowsPerFile, shards))
+
+        results = []
+        self._unchangedInputs = set()
+        for inputFile, outputFile, seconds, error, metrics in workerResults:
+            self.metrics.merge(metrics)
+            counters = metrics['counters']
+            if error is None and counters.get('filesWritten') == 0 and counters.get('filesUnchanged'):
+                self._unchangedInputs.add(inputFile)
+            results.append((inputFile, outputFile, seconds, error))
+
+        if self._cacheDir is not None:  # Workers only add entries; evict once everything is written
+            FlowCache(self._cacheDir, self._cacheBytes).prune()
+        return results
+
+    # Print per-file timings and failures for the results returned by run().
+    # Returns the number of failures.
+    def printSummary(self, results : [], totalTime : float) -> int:
+        failures = [result for result in results if result[3] is not None]
+
+        for inputFile, outputFile, seconds, error in results:
+            relativePath = os.path.relpath(inputFile, self._inputDir)
+            if error is None and inputFile in self._unchangedInputs:
+                print('  %8.3fs  %s -> %s (unchanged)' % (seconds, relativePath, outputFile))
+            elif error is None:
+                print('  %8.3fs  %s -> %s' % (seconds, relativePath, outputFile))
+            else:
+                print('  %8.3fs  %s FAILED: %s' % (seconds, relativePath, error))
+
+        print('Generated ' + str(len(results) - len(failures)) + ' of ' + str(len(results))
+              + ' MUnit suites with ' + str(self._jobs) + ' job(s).')
+        unchanged = sum(1 for result in results if result[0] in self._unchangedInputs)
+        if unchanged:
+            print(str(unchanged) + ' suite(s) were already up to date and left unchanged.')
+        if failures:
+            print(str(len(failures)) + ' suite(s) failed.')
+        print('Total execution time: ', str(totalTime))
+
+        return len(failures)
+
+# Returns true if the root element of the XML file at filePath is <mule>, and the file is not an MUnit suite.
+# Suites are <mule> documents too, but declare the munit namespace on their root, so only the root is read.
+def isMuleConfig(filePath : str) -> bool:
+    rootElement = MuleParser.readRootElement(filePath)
+    return rootElement is not None and rootElement[0] == 'mule' and 'xmlns:munit' not in rootElement[1]
+
+# Returns true if path is folder or lies somewhere under it.
+def _isInside(path : str, folder : str) -> bool:
+    path = os.path.abspath(path)
+    folder = os.path.abspath(folder)
+    return path == folder or path.startswith(os.path.join(folder, ''))
+
+# The project's FlowIndex and the coverage options, set in each worker process by _initializeWorker.
+_workerFlowIndex = None
+_workerCoverage = (CoveragePlanner.DEFAULT_STRATEGY, CoveragePlanner.DEFAULT_MAX_TESTS)
+
+# Set the FlowIndex and coverage options used by _generateSuite in this process.
+def _initializeWorker(flowIndex : FlowIndex, coverage : str = CoveragePlanner.DEFAULT_STRATEGY,
+                      maxTestsPerFlow : int = CoveragePlanner.DEFAULT_MAX_TESTS) -> None:
+    global _workerFlowIndex, _workerCoverage
+    _workerFlowIndex = flowIndex
+    _workerCoverage = (coverage, maxTestsPerFlow)
+
+# Run a fresh MuleLines pipeline for one config. Top level so it can be sent to worker processes.
+# Returns an (inputFilePath, outputFilePath, seconds, error, metrics) tuple rather than raising,
+# where metrics is the pipeline's GenerationMetrics as a dict.
+def _generateSuite(inputFilePath : str, outputFilePath : str, cacheDir : str = None, flowsPerFile : int = 0,
+                   shards : int = 0) -> tuple:
+    startTime = time.time()
+    metrics = GenerationMetrics()
+    try:
+        outputFolder = os.path.dirname(outputFilePath)
+        if outputFolder:
+            os.makedirs(outputFolder, exist_ok = True)
+
+        mule = MuleLines(FlowCache(cacheDir) if cacheDir is not None else None, _workerFlowIndex, *_workerCoverage)
+        metrics = mule.metrics
+        mule.parseMuleFileLines(inputFilePath)
+        mule.createMUnitTests()
+        if shards > 0:
+            mule.createMUnitSuiteShards(outputFilePath, shards, 1)  # The batch is already parallel
+        elif flowsPerFile > 0:
+            mule.createMUnitSuiteFiles(outputFilePath, flowsPerFile, 1)  # The batch is already parallel
+        else:
+            mule.createMUnitSuiteFile(outputFilePath)
+        error = None
+    except Exception as exception:
+        error = type(exception).__name__ + ': ' + str(exception)
+
+    return (inputFilePath, outputFilePath, time.time() - startTime, error, metrics.toDict())
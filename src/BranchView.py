@@ -0,0 +1,50 @@
+from itertools import chain
+
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# A read-only view of a flow with the operations of one branch of each of its choice blocks in place of the
+# block's choicePlaceholder. The first choicePlaceholder is kept, with its branch's operations following it,
+# since it marks where the test runs the flow; the later ones are replaced by their branch's operations.
+# The flow's pairs are shared between every view and never copied, so generating a test flow per branch
+# costs no more memory than the branches themselves.
+class BranchView:
+    # Initialize a view of basePairs, a list of TagPairs, with the TagPairs of each of branches (lists of
+    # TagPairs or TagListViews) placed at the choicePlaceholder at the matching position of placeholderIndexes.
+    def __init__(self, basePairs : [], placeholderIndexes : [], branches : []) -> None:
+        self._basePairs = basePairs
+        self._placeholderIndexes = placeholderIndexes
+        self._branches = branches
+
+    # Returns the number of TagPairs in the view.
+    def __len__(self) -> int:
+        replacedPlaceholders = max(len(self._placeholderIndexes) - 1, 0)
+        return len(self._basePairs) - replacedPlaceholders + sum(len(branch) for branch in self._branches)
+
+    # Returns a string output for the view.
+    def __str__(self) -> str:
+        output = '--- BranchView ---\n'
+        for pair in self.iterPairs():
+            output += str(pair) + '\n'
+        output += '------------------'
+
+        return output
+
+    # Returns an iterator over the TagPairs in the view, in order.
+    def iterPairs(self):
+        basePairs = self._basePairs
+        parts = []
+        position = 0
+        for number, (placeholderIndex, branch) in enumerate(zip(self._placeholderIndexes, self._branches)):
+            end = placeholderIndex + 1 if number == 0 else placeholderIndex  # Keep only the first placeholder
+            parts.append(map(basePairs.__getitem__, range(position, end)))
+            parts.append(branch)
+            position = placeholderIndex + 1
+        parts.append(map(basePairs.__getitem__, range(position, len(basePairs))))
+        return chain.from_iterable(parts)
+
+    # Returns a list of the TagPairs in the view.
+    def pairs(self) -> []:
+        return list(self.iterPairs())
@@ -0,0 +1,281 @@
+import re
+from collections import OrderedDict
+from FragmentTemplate import FragmentTemplate
+from TagList import TagList
+
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# A registry of the rules used to convert Mule flows to MUnit code.
+# Tag rules handle one tag, family rules handle every tag containing a fragment (e.g. 'inbound-endpoint'),
+# and connector rules give suites whose flows use a connector family one before-suite and after-suite block.
+# The handler for each tag is resolved once and kept in a dispatch dict, so converting a pair costs one
+# dict lookup. Handlers are called as handler(state, pair, nextTag), and add MUnit pairs to state.output.
+class ConversionRules:
+    _default = None
+
+    # Initialize an empty registry.
+    def __init__(self) -> None:
+        self._tagRules = {}
+        self._familyRules = []  # (fragment, handler) tuples, checked in the order they were added
+        self._connectorRules = OrderedDict()  # family -> (before-suite template, after-suite template)
+        self._dispatch = {}  # tag -> resolved handler, or None for tags without a rule
+
+    # Returns the registry holding the standard rules, building it on first use.
+    @classmethod
+    def default(cls):
+        if cls._default is None:
+            cls._default = cls._createDefault()
+        return cls._default
+
+    # Convert the pair with handler for tag. Replaces any rule already registered for tag.
+    def addTagRule(self, tag : str, handler) -> None:
+        self._tagRules[tag] = handler
+        self._dispatch.clear()
+
+    # Convert every tag containing fragment with handler. Tag rules take precedence over family rules.
+    def addFamilyRule(self, fragment : str, handler) -> None:
+        self._familyRules.append((fragment, handler))
+        self._dispatch.clear()
+
+    # Start the servers of the connector family with beforeSuite, and stop them with afterSuite, in every suite
+    # with a flow using the family. The family must be one of the families recognised by FlowSummary.CONNECTOR_TAGS.
+    def addConnectorRule(self, family : str, beforeSuite : FragmentTemplate, afterSuite : FragmentTemplate) -> None:
+        self._connectorRules[family] = (beforeSuite, afterSuite)
+
+    # Returns the handler for tag, or None if the tag has no rule.
+    def handlerFor(self, tag : str):
+        try:
+            return self._dispatch[tag]
+        except KeyError:
+            pass
+
+        handler = self._tagRules.get(tag)
+        if handler is None:
+            for fragment, familyHandler in self._familyRules:
+                if fragment in tag:
+                    handler = familyHandler
+                    break
+        self._dispatch[tag] = handler
+        return handler
+
+    # Returns the connector families with rules used anywhere in the flows described by summaries,
+    # in the order their rules were added.
+    def connectorFamilies(self, summaries) -> []:
+        used = set()
+        for summary in summaries:
+            used |= summary.allConnectors
+        return [family for family in self._connectorRules if family in used]
+
+    # Returns the MUnit pairs starting the servers of the connector families, one before-suite block per family.
+    def suiteSetup(self, families : []) -> []:
+        pairs = []
+        for family in families:
+            pairs.extend(self._connectorRules[family][0].stamp())
+        return pairs
+
+    # Returns the MUnit pairs stopping the servers of the connector families, one after-suite block per family.
+    def suiteTeardown(self, families : []) -> []:
+        pairs = []
+        for family in families:
+            pairs.extend(self._connectorRules[family][1].stamp())
+        return pairs
+
+    # Convert the TagPairs of a flow, described by summary, to a TagList of MUnit code.
+    # The servers used by the flow's connectors are started and stopped once per suite; see suiteSetup().
+    # flowKinds maps flow names to their kind ('flow' or 'sub-flow'), and is used to decide how to mock
+    # flow-refs; names missing from it are guessed from the name.
+    def convert(self, pairs, summary, flowKinds : dict = None) -> TagList:
+        state = _ConversionState()
+        state.afterChoiceBlock = not summary.hasChoicePlaceholder
+        state.flowKinds = flowKinds if flowKinds is not None else {}
+
+        dispatch = self._dispatch
+        for pair, nextTag in _pairsWithNextTag(pairs):
+            tag = pair.getTag()
+            handler = dispatch[tag] if tag in dispatch else self.handlerFor(tag)
+            if handler is not None:
+                handler(state, pair, nextTag)
+
+        return state.output
+
+    # Build the registry of standard rules.
+    @classmethod
+    def _createDefault(cls):
+        rules = cls()
+        rules.addTagRule('choicePlaceholder', _convertChoicePlaceholder)
+        rules.addTagRule('flow', _convertFlow)
+        rules.addTagRule('flow-ref', _convertFlowRef)
+        rules.addTagRule('ftp:outbound-endpoint', _convertFTPOutbound)
+        rules.addTagRule('http:listener', _convertInbound)
+        rules.addFamilyRule('inbound-endpoint', _convertInbound)
+        rules.addTagRule('set-payload', _convertSetPayload)
+        rules.addTagRule('/flow', _convertFlowEnd)
+        rules.addTagRule('/mule', _convertMuleEnd)
+
+        rules.addConnectorRule('db', _DB_BEFORE_SUITE, _DB_AFTER_SUITE)
+        rules.addConnectorRule('ftp', _FTP_BEFORE_SUITE, _FTP_AFTER_SUITE)
+        return rules
+
+# Values tracked while converting one flow.
+class _ConversionState:
+    __slots__ = ('output', 'muleFlowName', 'afterChoiceBlock', 'flowKinds')
+
+    def __init__(self) -> None:
+        self.output = TagList()
+        self.muleFlowName = ""
+        self.afterChoiceBlock = True  # Used to determine certain tag types
+        self.flowKinds = {}  # Flow name -> 'flow' or 'sub-flow'
+
+# Yields (pair, nextTag) for every TagPair in pairs, where nextTag is the tag of the following pair,
+# or '' for the last one. Works on any iterable, so flows need not be copied into a list to look ahead.
+def _pairsWithNextTag(pairs):
+    pairs = iter(pairs)
+    pair = next(pairs, None)
+    for nextPair in pairs:
+        yield (pair, nextPair.getTag())
+        pair = nextPair
+    if pair is not None:
+        yield (pair, '')
+
+# Shorthand for an attribute OrderedDict starting with closeAtEnd.
+def _attributes(closeAtEnd : bool, **attributes) -> OrderedDict:
+    output = OrderedDict({'closeAtEnd': closeAtEnd})
+    output.update(attributes)
+    return output
+
+# Matches flow-ref names which look like they refer to a sub-flow, e.g. 'subflow', 'sub-flow', 'sub_flow'
+# or 'sub flow'. Only used for names which are not defined in the project.
+_SUB_FLOW_NAME = re.compile('sub[-_ ]?flow')
+
+_SET_INITIAL_PAYLOAD = FragmentTemplate([
+    ('munit:set', _attributes(True, payload = '', **{'doc:name': 'Set Initial Test Payload'}))])
+
+_FLOW_REF = FragmentTemplate([
+    ('flow-ref', _attributes(True, name = '{name}', **{'doc:name': 'Flow-ref to {name}'}))])
+
+_NAMED_TEST = FragmentTemplate([
+    ('munit:test', _attributes(False, name = '{name}-test-', description = 'Unit Test for {name}'))])
+
+_UNNAMED_TEST = FragmentTemplate([
+    ('munit:test', _attributes(False, name = 'UnitTestFlow', description = 'Unit Test Flow for unnamed Mule Flow'))])
+
+_VERIFY_SUB_FLOW = FragmentTemplate([
+    ('mock:verify-call', _attributes(False, messageProcessor = 'mule:sub-flow',
+                                     **{'doc:name': 'Verify Call', 'times': '1'})),
+    ('mock:with-attributes', _attributes(False)),
+    ('mock:with-attribute', _attributes(True, name = 'name', whereValue = "#[matchContains('{name}')]")),
+    ('/mock:with-attributes', _attributes(False)),
+    ('/mock:verify-call', _attributes(False))])
+
+_MOCK_FLOW = FragmentTemplate([
+    ('mock:when', _attributes(False, **{'doc:name': 'Mock', 'messageProcessor': 'mule:flow'})),
+    ('mock:with-attributes', _attributes(False)),
+    ('mock:with-attribute', _attributes(True, name = 'name', whereValue = "#['{name}']")),
+    ('/mock:with-attributes', _attributes(False)),
+    ('mock:then-return', _attributes(False, payload = '#[]')),
+    ('mock:invocation-properties', _attributes(False)),
+    # Leave key and value blank, until it's clear how to accurately populate them
+    ('mock:invocation-property', _attributes(True, key = '', value = '')),
+    ('/mock:invocation-properties', _attributes(False)),
+    ('/mock:then-return', _attributes(False)),
+    ('/mock:when', _attributes(False))])
+
+_FTP_CONTAINS_FILES = FragmentTemplate([
+    ('ftpserver:contains-files', _attributes(True, file = '{file}', path = '{path}', **{'config-ref': ''}))])
+
+_ASSERT_PAYLOAD = FragmentTemplate([
+    ('munit:assert-payload-equals', _attributes(True, message = 'Incorrect payload!', expectedValue = '{value}'))])
+
+_MOCK_SET_PAYLOAD = FragmentTemplate([
+    ('mock:when', _attributes(False, **{'doc:name': 'Mock', 'messageProcessor': 'mule:set-payload'})),
+    ('mock:with-attributes', _attributes(False)),
+    ('mock:with-attribute', _attributes(True, name = 'doc:name', whereValue = "#['Set Original Payload']")),
+    ('/mock:with-attributes', _attributes(False)),
+    ('mock:then-return', _attributes(True, payload = '#[]')),
+    ('/mock:when', _attributes(False))])
+
+_END_TEST = FragmentTemplate([('/munit:test', _attributes(False))])
+
+_END_MULE = FragmentTemplate([('/mule', _attributes(False))])
+
+_DB_BEFORE_SUITE = FragmentTemplate([
+    ('munit:before-suite', _attributes(False, name = 'before-DB', description = 'Start DB Server')),
+    ('dbserver:start-db-server', _attributes(True, **{'config-ref': '', 'doc:name': 'Start DB'})),
+    ('/munit:before-suite', _attributes(False))])
+
+_DB_AFTER_SUITE = FragmentTemplate([
+    ('munit:after-suite', _attributes(False, name = 'after-DB', description = 'Stop DB Server')),
+    ('dbserver:stop-db-server', _attributes(True, **{'config-ref': '', 'doc:name': 'Stop Server'})),
+    ('/munit:after-suite', _attributes(False))])
+
+# The FTP mock server is started with the same before-suite block as the DB server
+_FTP_BEFORE_SUITE = FragmentTemplate([
+    ('munit:before-suite', _attributes(False, name = 'before-FTP', description = 'Start DB Server')),
+    ('dbserver:start-db-server', _attributes(True, **{'config-ref': '', 'doc:name': 'Start FTP'})),
+    ('/munit:before-suite', _attributes(False))])
+
+_FTP_AFTER_SUITE = FragmentTemplate([
+    ('munit:after-suite', _attributes(False, name = 'after-FTP', description = 'Stop FTP Server')),
+    ('ftpserver:stop-server', _attributes(True, **{'config-ref': ''})),
+    ('/munit:after-suite', _attributes(False))])
+
+# Handle choicePlaceholder tag: run the flow itself once the choice operations are mocked
+def _convertChoicePlaceholder(state : _ConversionState, pair, nextTag : str) -> None:
+    state.afterChoiceBlock = True
+    state.output.extend(_FLOW_REF.stamp(name = state.muleFlowName))
+
+# Handle flow tag: open the test, and place a mock payload if a payload isn't set at the start of the flow
+def _convertFlow(state : _ConversionState, pair, nextTag : str) -> None:
+    name = pair.getAttribute('name')
+    if name is not None:  # Get the name, store it and set MUnit test name
+        state.muleFlowName = name
+        state.output.extend(_NAMED_TEST.stamp(name = name))
+    else:  # Set generic MUnit test name
+        state.output.extend(_UNNAMED_TEST.stamp())
+
+    if nextTag != 'set-payload' and nextTag != 'http:listener' and not 'inbound-endpoint' in nextTag:
+        state.output.extend(_SET_INITIAL_PAYLOAD.stamp())
+
+# Returns the kind ('flow' or 'sub-flow') of the flow called name, guessing from the name if it is unknown,
+# e.g. an expression or a flow defined outside of the project.
+def flowRefKind(flowKinds : dict, name : str) -> str:
+    kind = flowKinds.get(name)
+    if kind is None:
+        kind = 'sub-flow' if _SUB_FLOW_NAME.search(name.lower()) else 'flow'
+    return kind
+
+# Handle flow-ref tag: verify calls to sub-flows, and mock calls to flows
+def _convertFlowRef(state : _ConversionState, pair, nextTag : str) -> None:
+    name = pair.getAttributes()['name']
+    if flowRefKind(state.flowKinds, name) == 'sub-flow':
+        state.output.extend(_VERIFY_SUB_FLOW.stamp(name = name))
+    else:
+        state.output.extend(_MOCK_FLOW.stamp(name = name))
+
+# Handle ftp:outbound-endpoint tag
+def _convertFTPOutbound(state : _ConversionState, pair, nextTag : str) -> None:
+    state.output.extend(_FTP_CONTAINS_FILES.stamp(file = pair.getAttribute('outputPattern'),
+                                                  path = pair.getAttribute('path')))
+
+# If at the entrance point to the flow, set a payload if one isn't set after
+def _convertInbound(state : _ConversionState, pair, nextTag : str) -> None:
+    if nextTag != 'set-payload':
+        state.output.extend(_SET_INITIAL_PAYLOAD.stamp())
+
+# Handle set-payload tag: assert the payload after the choice block, and mock it before
+def _convertSetPayload(state : _ConversionState, pair, nextTag : str) -> None:
+    if state.afterChoiceBlock:
+        state.output.extend(_ASSERT_PAYLOAD.stamp(value = pair.getAttributes()['value']))
+    else:
+        state.output.extend(_MOCK_SET_PAYLOAD.stamp())
+
+# Handle /flow tag: close the test
+def _convertFlowEnd(state : _ConversionState, pair, nextTag : str) -> None:
+    state.output.extend(_END_TEST.stamp())
+
+# Handle /mule tag
+def _convertMuleEnd(state : _ConversionState, pair, nextTag : str) -> None:
+    state.output.extend(_END_MULE.stamp())
@@ -0,0 +1,84 @@
+from itertools import combinations, islice, product
+
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# Chooses which branches the generated tests of a flow with several choice blocks take. Each block is given
+# as its number of alternatives, and each test as a tuple holding the alternative it takes in every block.
+#   all       every combination of alternatives
+#   each      every alternative of every block at least once, in as many tests as the largest block has
+#   pairwise  every pair of alternatives of two different blocks at least once
+# Every strategy stops at maxTests tests, so deeply branched flows cannot blow up the suite.
+class CoveragePlanner:
+    STRATEGIES = ('each', 'pairwise', 'all')
+    DEFAULT_STRATEGY = 'each'
+    DEFAULT_MAX_TESTS = 64  # Tests generated per flow at most
+
+    # Returns a list of tuples, one per test, holding the position of the alternative each block takes,
+    # for blocks with the numbers of alternatives in sizes. Tests are in a fixed order for the same input.
+    # Can raise a TypeError if strategy is not one of STRATEGIES, maxTests is not an int above 0, or
+    # sizes holds anything but ints above 0.
+    @classmethod
+    def combinations(cls, sizes : [], strategy : str = DEFAULT_STRATEGY, maxTests : int = DEFAULT_MAX_TESTS) -> []:
+        cls.checkOptions(strategy, maxTests)
+        for size in sizes:
+            if not isinstance(size, int) or size < 1:
+                raise TypeError('sizes passed to CoveragePlanner combinations must be ints above 0')
+
+        if strategy == 'all':
+            return list(islice(product(*[range(size) for size in sizes]), maxTests))
+        if strategy == 'pairwise' and len(sizes) > 1:
+            return cls._pairwise(sizes, maxTests)
+        # With a single block, pairwise coverage is the same as covering each alternative
+        testCount = min(max(sizes, default = 1), maxTests)
+        return [tuple(test % size for size in sizes) for test in range(testCount)]
+
+    # Check the options of a planner.
+    # Can raise a TypeError if strategy is not one of STRATEGIES or maxTests is not an int above 0.
+    @classmethod
+    def checkOptions(cls, strategy : str, maxTests : int) -> None:
+        if strategy not in cls.STRATEGIES:
+            raise TypeError('strategy passed to CoveragePlanner must be one of ' + ', '.join(cls.STRATEGIES))
+        if not isinstance(maxTests, int) or maxTests < 1:
+            raise TypeError('maxTests passed to CoveragePlanner must be an int above 0')
+
+    # Returns tests covering every pair of alternatives of two different blocks, built greedily: each test
+    # starts from the first pair not yet covered, and every other block takes the alternative covering the
+    # most new pairs with the blocks chosen before it.
+    @classmethod
+    def _pairwise(cls, sizes : [], maxTests : int) -> []:
+        uncovered = {(first, firstAlternative, second, secondAlternative)
+                     for first, second in combinations(range(len(sizes)), 2)
+                     for firstAlternative in range(sizes[first])
+                     for secondAlternative in range(sizes[second])}
+        tests = []
+        while uncovered and len(tests) < maxTests:
+            first, firstAlternative, second, secondAlternative = min(uncovered)
+            test = [None] * len(sizes)
+            test[first] = firstAlternative
+            test[second] = secondAlternative
+            for block, size in enumerate(sizes):
+                if test[block] is None:
+                    test[block] = max(range(size), key = lambda alternative:
+                                      (cls._newPairs(test, block, alternative, uncovered), -alternative))
+
+            for first, second in combinations(range(len(sizes)), 2):
+                uncovered.discard((first, test[first], second, test[second]))
+            tests.append(tuple(test))
+        return tests
+
+    # Returns the number of pairs in uncovered which block taking alternative would cover, with the blocks
+    # already chosen in test.
+    @staticmethod
+    def _newPairs(test : [], block : int, alternative : int, uncovered : set) -> int:
+        newPairs = 0
+        for other, otherAlternative in enumerate(test):
+            if otherAlternative is None or other == block:
+                continue
+            if other < block:
+                newPairs += (other, otherAlternative, block, alternative) in uncovered
+            else:
+                newPairs += (block, alternative, other, otherAlternative) in uncovered
+        return newPairs
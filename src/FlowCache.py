@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from FrozenAttributes import FrozenAttributes
+from TagPair import TagPair
+
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# A cache of generated MUnit TagPairs for individual Mule flows, keyed by a fingerprint of the flow's
+# TagPairs and the generator version. Entries are kept in memory, and also on disk when a directory
+# is given, so unchanged flows are not converted again on the next run.
+# The disk cache is bounded by size; the least recently used entries are evicted by prune().
+# A cache may be shared by threads; disk entries are written atomically, so it may also be shared by processes.
+class FlowCache:
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+    MAX_MEMORY_ENTRIES = 4096
+    ENTRY_SUFFIX = '.json'
+
+    # Initialize a cache stored in directory, or a memory-only cache if directory is None.
+    def __init__(self, directory : str = None, maxBytes : int = DEFAULT_MAX_BYTES) -> None:
+        self._directory = directory
+        self._maxBytes = maxBytes
+        self._memory = OrderedDict()  # Most recently used entries last
+        self._lock = threading.Lock()  # Guards _memory and the counters
+        self.hits = 0
+        self.misses = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok = True)
+
+    # Returns a hex fingerprint of the flow's TagPairs, in order, combined with the version string.
+    @staticmethod
+    def fingerprint(flowPairs, version : str) -> str:
+        digest = hashlib.sha1(version.encode('utf-8'))
+        for pair in flowPairs:
+            digest.update(repr((pair.getTag(), tuple(pair.getAttributes().items()))).encode('utf-8'))
+        return digest.hexdigest()
+
+    # Returns the list of TagPairs cached under key, or None if there is no such entry.
+    def get(self, key : str) -> []:
+        with self._lock:
+            pairs = self._memory.get(key)
+            if pairs is not None:
+                self._memory.move_to_end(key)
+
+        if pairs is None and self._directory is not None:
+            pairs = self._readEntry(key)
+            if pairs is not None:
+                self._remember(key, pairs)
+
+        with self._lock:
+            if pairs is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return list(pairs)
+
+    # Cache the list of TagPairs generated for the flow fingerprinted as key.
+    def put(self, key : str, pairs : []) -> None:
+        pairs = tuple(pairs)
+        self._remember(key, pairs)
+        if self._directory is not None:
+            self._writeEntry(key, pairs)
+
+    # Evict the least recently used disk entries until the cache fits in its size bound.
+    def prune(self) -> None:
+        if self._directory is None:
+            return
+
+        entries = []
+        totalBytes = 0
+        for entry in os.scandir(self._directory):
+            if entry.name.endswith(self.ENTRY_SUFFIX):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                totalBytes += stat.st_size
+
+        entries.sort()  # Oldest first
+        for mtime, size, path in entries:
+            if totalBytes <= self._maxBytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            totalBytes -= size
+
+    # Add an entry to the in-memory cache, dropping the least recently used one when it is full.
+    def _remember(self, key : str, pairs : tuple) -> None:
+        with self._lock:
+            self._memory[key] = pairs
+            self._memory.move_to_end(key)
+            if len(self._memory) > self.MAX_MEMORY_ENTRIES:
+                self._memory.popitem(last = False)
+
+    # Returns the path of the disk entry for key.
+    def _entryPath(self, key : str) -> str:
+        return os.path.join(self._directory, key + self.ENTRY_SUFFIX)
+
+    # Read the disk entry for key, or return None if it is missing or unreadable.
+    def _readEntry(self, key : str) -> tuple:
+        path = self._entryPath(key)
+        try:
+            with open(path, 'r', encoding = 'utf-8') as file:
+                entry = json.load(file)
+            os.utime(path)  # Mark as recently used for prune()
+        except (OSError, ValueError):
+            return None
+
+        return tuple(TagPair(tag, FrozenAttributes.share(OrderedDict(items))) for tag, items in entry)
+
+    # Write the disk entry for key. The file is replaced atomically, so concurrent runs never see
+    # a partial entry. Failing to write only costs a later cache miss.
+    def _writeEntry(self, key : str, pairs : tuple) -> None:
+        entry = [[pair.getTag(), list(pair.getAttributes().items())] for pair in pairs]
+        try:
+            fileDescriptor, temporaryPath = tempfile.mkstemp(dir = self._directory, suffix = '.tmp')
+        except OSError:
+            return
+
+        try:
+            with os.fdopen(fileDescriptor, 'w', encoding = 'utf-8') as file:
+                json.dump(entry, file, separators = (',', ':'))
+            os.replace(temporaryPath, self._entryPath(key))
+        except OSError:
+            try:
+                os.remove(temporaryPath)
+            except OSError:
+                pass
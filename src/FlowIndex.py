@@ -0,0 +1,135 @@
+import json
+import os
+import tempfile
+from xml.parsers import expat
+
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# An index of every flow and sub-flow name defined in the Mule configs of a project, so flow-refs can be
+# resolved to the kind of flow they call with a dict lookup.
+# The index can be saved to a file and loaded on the next run; update() only rescans configs whose
+# modification time or size changed since they were indexed.
+class FlowIndex:
+    INDEX_VERSION = 1
+    INDEX_FILE = 'flows.index'  # Name of the index within a cache folder
+    FLOW_KINDS = ('flow', 'sub-flow')
+
+    # Initialize an empty index, stored at indexPath if given.
+    def __init__(self, indexPath : str = None) -> None:
+        self._indexPath = indexPath
+        self._files = {}  # Config path -> [mtime_ns, size, flow names, sub-flow names]
+        self._kinds = None  # Flow name -> kind, rebuilt from _files when needed
+        self.filesScanned = 0  # Configs read by the last update()
+
+    # Returns the index stored at indexPath, or an empty index there if the file is missing or unreadable.
+    @classmethod
+    def load(cls, indexPath : str):
+        index = cls(indexPath)
+        try:
+            with open(indexPath, 'r', encoding = 'utf-8') as file:
+                stored = json.load(file)
+            if stored.get('version') == cls.INDEX_VERSION:
+                index._files = stored['files']
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        return index
+
+    # Returns the index kept in cacheDir, or an in-memory index if cacheDir is None.
+    @classmethod
+    def forCacheDir(cls, cacheDir : str):
+        if cacheDir is None:
+            return cls()
+        return cls.load(os.path.join(cacheDir, cls.INDEX_FILE))
+
+    # Write the index to its indexPath, replacing the file atomically. Does nothing without an indexPath.
+    # Failing to write only costs a full scan on the next run.
+    def save(self) -> None:
+        if self._indexPath is None:
+            return
+
+        folder = os.path.dirname(self._indexPath) or '.'
+        try:
+            os.makedirs(folder, exist_ok = True)
+            fileDescriptor, temporaryPath = tempfile.mkstemp(dir = folder, suffix = '.tmp')
+        except OSError:
+            return
+
+        try:
+            with os.fdopen(fileDescriptor, 'w', encoding = 'utf-8') as file:
+                json.dump({'version': self.INDEX_VERSION, 'files': self._files}, file, separators = (',', ':'))
+            os.replace(temporaryPath, self._indexPath)
+        except OSError:
+            try:
+                os.remove(temporaryPath)
+            except OSError:
+                pass
+
+    # Bring the index up to date with the Mule configs at configPaths. New and changed configs are scanned,
+    # and configs which are no longer listed are dropped. Returns true if any flow name or kind changed.
+    def update(self, configPaths : []) -> bool:
+        before = self.kinds()
+        files = {}
+        self.filesScanned = 0
+        for path in configPaths:
+            path = os.path.abspath(path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            entry = self._files.get(path)
+            if entry is None or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+                flowNames, subFlowNames = _scanFlows(path)
+                entry = [stat.st_mtime_ns, stat.st_size, flowNames, subFlowNames]
+                self.filesScanned += 1
+            files[path] = entry
+
+        self._files = files
+        self._kinds = None
+        return self.kinds() != before
+
+    # Returns a dict of every indexed flow name to its kind.
+    # A name defined more than once keeps the kind from the config indexed last.
+    def kinds(self) -> dict:
+        if self._kinds is None:
+            kinds = {}
+            for mtime, size, flowNames, subFlowNames in self._files.values():
+                kinds.update(dict.fromkeys(flowNames, 'flow'))
+                kinds.update(dict.fromkeys(subFlowNames, 'sub-flow'))
+            self._kinds = kinds
+        return self._kinds
+
+    # Returns a dict of every flow and sub-flow name defined by the TagPairs in pairs to its kind.
+    @classmethod
+    def kindsInPairs(cls, pairs) -> dict:
+        kinds = {}
+        for pair in pairs:
+            if pair.getTag() in cls.FLOW_KINDS:
+                name = pair.getAttribute('name')
+                if name is not None:
+                    kinds[name] = pair.getTag()
+        return kinds
+
+# Returns the lists of flow and sub-flow names defined in the XML file at path.
+# Files which cannot be read or are not XML define no flows.
+def _scanFlows(path : str) -> ([], []):
+    names = {'flow': [], 'sub-flow': []}
+
+    def startElement(name : str, attributes : dict) -> None:
+        flowNames = names.get(name.lower())
+        if flowNames is not None and 'name' in attributes:
+            # Escape the name the same way MuleParser escapes attribute values, so flow-ref names match
+            name = attributes['name'].replace('&', '&amp;').replace('<', '&lt;').replace('"', '&quot;')
+            flowNames.append(name)
+
+    parser = expat.ParserCreate()
+    parser.StartElementHandler = startElement
+    try:
+        with open(path, 'rb') as file:
+            parser.ParseFile(file)
+    except (OSError, expat.ExpatError):
+        pass
+    return names['flow'], names['sub-flow']
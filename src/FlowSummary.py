@@ -0,0 +1,79 @@
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# A summary of the features of one Mule flow, built in a single pass over its TagPairs.
+# Records the connector families and flow-refs the flow uses, the (start, end) positions of every choice
+# block, and the end position of every block, so the end of any element can be looked up without
+# rescanning the flow. Positions count from 0 at the flow's opening tag.
+class FlowSummary:
+    # Connector families, keyed by the tags which identify them.
+    CONNECTOR_TAGS = {
+        'db:select': 'db', 'db:insert': 'db', 'db:update': 'db', 'db:delete': 'db',
+        'db:stored-procedure': 'db', 'db:bulk-execute': 'db', 'db:execute-ddl': 'db',
+        'ftp:outbound-endpoint': 'ftp',
+    }
+    BRANCH_TAGS = frozenset(('when', 'otherwise'))
+
+    # Initialize an empty summary; feed it the flow's pairs in order with observe().
+    def __init__(self) -> None:
+        self.allConnectors = set()  # Connector families used anywhere in the flow, including choice blocks
+        self.hasChoicePlaceholder = False  # True if a choice block has already been replaced
+        self.flowRefNames = []  # Names called by flow-refs anywhere in the flow, in document order
+        self._choiceStarts = []  # Start positions of choice blocks, in document order
+        self._blockEnds = {}  # Start position -> end position of every block with children
+        self._openBlocks = []  # Stack of (tag, start position) for blocks not yet closed
+        self._length = 0
+
+    # Returns a summary of the TagPairs in pairs.
+    @classmethod
+    def fromPairs(cls, pairs):
+        summary = cls()
+        for pair in pairs:
+            summary.observe(pair)
+        return summary
+
+    # Add the next pair of the flow to the summary.
+    def observe(self, pair) -> None:
+        position = self._length
+        self._length += 1
+        tag = pair.getTag()
+
+        if tag[0] == '/':  # Close the matching block; stray closing tags are ignored
+            if self._openBlocks and self._openBlocks[-1][0] == tag[1:]:
+                start = self._openBlocks.pop()[1]
+                self._blockEnds[start] = position
+            return
+
+        if not pair.getAttribute('closeAtEnd'):
+            self._openBlocks.append((tag, position))
+            if tag == 'choice':
+                self._choiceStarts.append(position)
+
+        if tag == 'choicePlaceholder':
+            self.hasChoicePlaceholder = True
+        elif tag == 'flow-ref':
+            self.flowRefNames.append(pair.getAttribute('name'))
+        else:
+            family = self.CONNECTOR_TAGS.get(tag)
+            if family is not None:
+                self.allConnectors.add(family)
+
+    # Returns a list of (start, end) positions of every choice block, in document order.
+    def choiceSpans(self) -> []:
+        return [(start, self._blockEnds.get(start)) for start in self._choiceStarts]
+
+    # Returns the position of the closing tag of the block starting at position, or position itself
+    # for an element without children.
+    def blockEnd(self, position : int) -> int:
+        return self._blockEnds.get(position, position)
+
+    # Returns a summary of this flow, with its choice blocks replaced by a choicePlaceholder and
+    # the operations summarized by branchSummary inserted in their place.
+    # Block positions are not carried over, since they no longer line up with the combined flow.
+    def withBranch(self, branchSummary):
+        summary = FlowSummary()
+        summary.allConnectors = self.allConnectors | branchSummary.allConnectors
+        summary.hasChoicePlaceholder = True
+        return summary
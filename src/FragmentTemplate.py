@@ -0,0 +1,52 @@
+from collections import OrderedDict
+from string import Formatter
+from FrozenAttributes import FrozenAttributes
+from TagPair import TagPair
+
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# A prebuilt fragment of MUnit code: a sequence of tags and attributes, where attribute values may hold
+# str.format style placeholders such as "#['{name}']". Fixed attribute maps are frozen and shared once,
+# when the template is built; stamp() only fills in the placeholders.
+# A value which is exactly one placeholder, e.g. '{value}', is replaced by the raw value given to stamp().
+class FragmentTemplate:
+    # Initialize from a list of (tag, OrderedDict attributes) tuples.
+    def __init__(self, parts : []) -> None:
+        self._parts = []  # (tag, FrozenAttributes, fields) tuples; fields is None for fixed parts
+        for tag, attributes in parts:
+            fixedAttributes = OrderedDict()
+            fields = []  # (attribute name, raw value key or None, format string)
+            for name, value in attributes.items():
+                if not isinstance(value, str):
+                    fixedAttributes[name] = value
+                    continue
+
+                parsed = list(Formatter().parse(value))
+                keys = [key for literal, key, spec, conversion in parsed if key is not None]
+                if not keys:
+                    fixedAttributes[name] = ''.join(literal for literal, key, spec, conversion in parsed)
+                    continue
+
+                fixedAttributes[name] = ''  # Holds the attribute's place, so the attribute order is kept
+                if len(parsed) == 1 and not parsed[0][0] and not parsed[0][2] and not parsed[0][3]:
+                    fields.append((name, keys[0], None))
+                else:
+                    fields.append((name, None, value))
+
+            self._parts.append((tag, FrozenAttributes.share(fixedAttributes), tuple(fields) or None))
+
+    # Returns a list of new TagPairs for the fragment, with placeholders filled in from values.
+    # Can raise a KeyError if a placeholder has no value.
+    def stamp(self, **values) -> []:
+        pairs = []
+        for tag, attributes, fields in self._parts:
+            if fields is not None:
+                attributes = attributes.copy()
+                for name, key, formatString in fields:
+                    attributes[name] = values[key] if formatString is None else formatString.format_map(values)
+                attributes = FrozenAttributes.share(attributes)
+            pairs.append(TagPair(tag, attributes))
+        return pairs
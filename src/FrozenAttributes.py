@@ -0,0 +1,74 @@
+from collections import OrderedDict
+from weakref import WeakValueDictionary
+
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# A read-only OrderedDict of XML attributes which can be shared between any number of TagPairs.
+# TagPair copies a FrozenAttributes into a private OrderedDict before changing it (copy-on-write).
+class FrozenAttributes(OrderedDict):
+    # Canonical instances handed out by share(), keyed by their items.
+    # Entries disappear once no TagPair refers to them any more.
+    _shared = WeakValueDictionary()
+
+    # Initialize from a mapping or an iterable of (key, value) pairs.
+    def __init__(self, items = ()) -> None:
+        if hasattr(items, 'items'):
+            items = items.items()
+        for key, value in items:
+            OrderedDict.__setitem__(self, key, value)
+
+    # Returns a shared, read-only copy of attributes. Equal attribute maps share one instance.
+    @classmethod
+    def share(cls, attributes : OrderedDict):
+        if isinstance(attributes, FrozenAttributes):
+            return attributes
+
+        key = tuple(attributes.items())
+        try:
+            shared = cls._shared.get(key)
+        except TypeError:  # Unhashable values cannot be shared
+            return cls(key)
+
+        if shared is None:
+            shared = cls(key)
+            cls._shared[key] = shared
+        return shared
+
+    # Raised by every method which would change the attributes.
+    def _readOnly(self, *args, **kwargs) -> None:
+        raise TypeError('FrozenAttributes cannot be changed; use the TagPair setters instead')
+
+    __setitem__ = _readOnly
+    __delitem__ = _readOnly
+    __ior__ = _readOnly
+    clear = _readOnly
+    move_to_end = _readOnly
+    pop = _readOnly
+    popitem = _readOnly
+    setdefault = _readOnly
+    update = _readOnly
+
+    # Returns a dict in which TagPair caches the fingerprints of pairs with these attributes, by tag.
+    # The attributes never change, so each is computed once for all the pairs sharing them.
+    def pairFingerprints(self) -> dict:
+        fingerprints = self.__dict__.get('_pairFingerprints')
+        if fingerprints is None:
+            fingerprints = self.__dict__['_pairFingerprints'] = {}
+        return fingerprints
+
+    # Returns a mutable OrderedDict copy of the attributes.
+    def copy(self) -> OrderedDict:
+        return OrderedDict(self)
+
+    # Returns a mutable OrderedDict merging the attributes with other.
+    def __or__(self, other) -> OrderedDict:
+        output = OrderedDict(self)
+        output.update(other)
+        return output
+
+    # Rebuild through __init__ when pickled or copied, since __setitem__ is disabled.
+    def __reduce__(self):
+        return (FrozenAttributes, (list(self.items()),))
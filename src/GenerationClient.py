@@ -0,0 +1,82 @@
+import json
+import socket
+from GenerationServer import GenerationServer
+
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# A client for a GenerationServer, speaking its request protocol over TCP or a Unix socket.
+# One connection is opened per client and reused for every request.
+class GenerationClient:
+    # Initialize a client of the server at host:port, or at the Unix socket socketPath if it is given.
+    # timeout is the number of seconds to wait for the server before giving up.
+    def __init__(self, host : str = GenerationServer.DEFAULT_HOST, port : int = GenerationServer.DEFAULT_PORT,
+                 socketPath : str = None, timeout : float = 60.0) -> None:
+        self._host = host
+        self._port = port
+        self._socketPath = socketPath
+        self._timeout = timeout
+        self._socket = None
+        self._stream = None
+
+    # Returns the suite generated by the server for the Mule config in payload (bytes), as UTF-8 bytes.
+    # name is the config's file name. options, if given, override the server's own options for this request;
+    # see GenerationServer.REQUEST_OPTIONS. Can raise an OSError if the server cannot be reached,
+    # or a ValueError if the server could not generate the suite.
+    def generate(self, payload : bytes, name : str, options : dict = None) -> bytes:
+        header = dict(options) if options else {}
+        header.update(name = name, length = len(payload))
+        header, suite = self._request(header, payload)
+        if header.get('status') != 'ok':
+            raise ValueError(header.get('error', 'Generation failed'))
+        return suite
+
+    # Returns the request counts and latency percentiles of the server.
+    # Can raise an OSError if the server cannot be reached.
+    def stats(self) -> dict:
+        header, payload = self._request({'command': 'stats'})
+        return json.loads(payload.decode('utf-8'))
+
+    # Close the connection to the server.
+    def close(self) -> None:
+        if self._socket is not None:
+            self._stream.close()
+            self._socket.close()
+            self._socket = None
+            self._stream = None
+
+    # Send a request and return the response's (header, payload).
+    def _request(self, header : dict, payload : bytes = b'') -> (dict, bytes):
+        if self._socket is None:
+            self._connect()
+
+        self._socket.sendall(json.dumps(header).encode('utf-8') + b'\n' + payload)
+        line = self._stream.readline()
+        if not line:
+            self.close()
+            raise ConnectionError('The generation server closed the connection')
+
+        response = json.loads(line)
+        length = int(response.get('length', 0))
+        body = self._stream.read(length)
+        if len(body) != length:
+            self.close()
+            raise ConnectionError('The generation server closed the connection mid-response')
+        return response, body
+
+    # Open the connection to the server.
+    def _connect(self) -> None:
+        if self._socketPath is not None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(self._timeout)
+            try:
+                self._socket.connect(self._socketPath)
+            except OSError:
+                self._socket.close()
+                self._socket = None
+                raise
+        else:
+            self._socket = socket.create_connection((self._host, self._port), self._timeout)
+        self._stream = self._socket.makefile('rb')
@@ -0,0 +1,89 @@
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# Phase timings and counters recorded while generating MUnit suites.
+# Phases may be nested; time spent in an inner phase is not counted towards the outer one, so the
+# phase times add up to the total time spent in phases.
+class GenerationMetrics:
+    # Phases and counters, in the order they are reported.
+    PHASES = ('index', 'parse', 'isolate', 'cache', 'expand', 'convert', 'write')
+    COUNTERS = ('configsIndexed', 'linesRead', 'tagPairsCreated', 'flowsIsolated', 'flowsFromCache',
+                'branchesExpanded', 'duplicateTestsDropped', 'mUnitPairsEmitted', 'bytesWritten', 'filesWritten', 'filesUnchanged')
+
+    # Initialize with every phase time and counter at 0.
+    def __init__(self) -> None:
+        self.seconds = OrderedDict((phase, 0.0) for phase in self.PHASES)
+        self.counters = OrderedDict((counter, 0) for counter in self.COUNTERS)
+        self._phaseStack = []
+        self._phaseStart = 0.0
+
+    # Context manager timing the code it wraps as part of the phase.
+    @contextmanager
+    def phase(self, name : str):
+        self._enterPhase(name)
+        try:
+            yield
+        finally:
+            self._exitPhase()
+
+    # Add amount to the counter.
+    def count(self, counter : str, amount : int = 1) -> None:
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    # Add the timings and counters of other, a GenerationMetrics or a dict from toDict(), to these metrics.
+    def merge(self, other) -> None:
+        if isinstance(other, GenerationMetrics):
+            other = other.toDict()
+        for phase, seconds in other['seconds'].items():
+            self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+        for counter, amount in other['counters'].items():
+            self.count(counter, amount)
+
+    # Returns the total time spent in phases.
+    def totalSeconds(self) -> float:
+        return sum(self.seconds.values())
+
+    # Returns the metrics as a dict of plain values, e.g. for json.dump or sending between processes.
+    def toDict(self) -> dict:
+        return {'seconds': dict(self.seconds), 'totalSeconds': self.totalSeconds(), 'counters': dict(self.counters)}
+
+    # Returns a printable table of the metrics.
+    def report(self) -> str:
+        totalSeconds = self.totalSeconds()
+        # Size the name columns to the longest name, so no name pushes its value out of line
+        width = max(len(name) for name in list(self.seconds) + ['total'])
+        lines = ['Phase timings:']
+        for phase, seconds in self.seconds.items():
+            share = seconds / totalSeconds * 100 if totalSeconds else 0.0
+            lines.append('  %-*s %10.4fs %6.1f%%' % (width, phase, seconds, share))
+        lines.append('  %-*s %10.4fs' % (width, 'total', totalSeconds))
+
+        width = max(len(name) for name in self.counters)
+        lines.append('Counters:')
+        for counter, amount in self.counters.items():
+            lines.append('  %-*s %12d' % (width, counter, amount))
+        return '\n'.join(lines)
+
+    # Start timing name, pausing the phase it is nested in.
+    def _enterPhase(self, name : str) -> None:
+        now = time.perf_counter()
+        if self._phaseStack:
+            self._addSeconds(self._phaseStack[-1], now - self._phaseStart)
+        self._phaseStack.append(name)
+        self._phaseStart = now
+
+    # Stop timing the innermost phase, resuming the phase it is nested in.
+    def _exitPhase(self) -> None:
+        now = time.perf_counter()
+        self._addSeconds(self._phaseStack.pop(), now - self._phaseStart)
+        self._phaseStart = now
+
+    # Add seconds to the time of phase.
+    def _addSeconds(self, phase : str, seconds : float) -> None:
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from BatchGenerator import BatchGenerator
+from CoveragePlanner import CoveragePlanner
+from FlowCache import FlowCache
+from FlowIndex import FlowIndex
+from GenerationMetrics import GenerationMetrics
+from MuleLines import MuleLines
+
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# A local generation server, so scripts which generate many suites pay for Python start-up and imports once.
+# Clients connect over TCP or a Unix socket, and send any number of requests on one connection. Each request is
+# a JSON header line followed by a payload of header['length'] bytes:
+#     {"name": "example.xml", "length": 2491}\n<Mule XML>   generate the suite for a config
+#     {"command": "stats"}\n                                 report request counts and latency percentiles
+# A generate request may also carry the options of the client's command line, which override the server's own:
+# 'coverage' and 'maxTestsPerFlow', and 'projectDir' (an absolute path, or null for a config outside of a project)
+# with the 'glob' its configs are found by, so flow-refs resolve the same way as in a local run.
+# Each response is a JSON header line with a 'status' of 'ok' or 'error', followed by a payload of
+# header['length'] bytes (the UTF-8 suite XML, or the stats JSON).
+# Suites are generated on a pool of worker processes, each holding a warm MuleLines and FlowCache.
+class GenerationServer:
+    DEFAULT_HOST = '127.0.0.1'
+    DEFAULT_PORT = 8765
+    LATENCY_WINDOW = 10000  # Number of recent requests latency percentiles are computed over
+    REQUEST_OPTIONS = ('coverage', 'maxTestsPerFlow', 'projectDir', 'glob')  # Header keys overriding server options
+
+    # Initialize a server listening on host:port, or on the Unix socket at socketPath if it is given.
+    # jobs is the number of worker processes; None uses one per CPU.
+    # cacheDir, if given, is a FlowCache folder shared by every worker.
+    # flowIndex, if given, resolves flow-refs to flows defined outside the requested config.
+    # coverage and maxTestsPerFlow choose the tests of flows with several or nested choice blocks; see MuleLines.
+    def __init__(self, host : str = DEFAULT_HOST, port : int = DEFAULT_PORT, socketPath : str = None,
+                 jobs : int = None, cacheDir : str = None, cacheBytes : int = FlowCache.DEFAULT_MAX_BYTES,
+                 flowIndex : FlowIndex = None, coverage : str = CoveragePlanner.DEFAULT_STRATEGY,
+                 maxTestsPerFlow : int = CoveragePlanner.DEFAULT_MAX_TESTS) -> None:
+        self._host = host
+        self._port = port
+        self._socketPath = socketPath
+        self._jobs = jobs if jobs else (os.cpu_count() or 1)
+        self._cacheDir = cacheDir
+        self._cacheBytes = cacheBytes
+        self._flowIndex = flowIndex
+        self._coverage = coverage
+        self._maxTestsPerFlow = maxTestsPerFlow
+        self._executor = None
+        self._startTime = time.time()
+        self._latencies = deque(maxlen = self.LATENCY_WINDOW)  # Seconds per generate request
+        self.requests = 0
+        self.errors = 0
+
+    # Serve requests until interrupted or terminated, then print the request statistics.
+    def run(self) -> None:
+        self._executor = ProcessPoolExecutor(max_workers = self._jobs, initializer = _initializeWorker,
+                                             initargs = (self._cacheDir, self._cacheBytes, self._flowIndex,
+                                                         self._coverage, self._maxTestsPerFlow))
+        try:
+            asyncio.run(self._serve())
+        except KeyboardInterrupt:
+            print('Stopped serving.')
+        finally:
+            self._executor.shutdown()
+            if self._cacheDir is not None:
+                FlowCache(self._cacheDir, self._cacheBytes).prune()
+            print(self.report())
+
+    # Returns a dict of request counts and latency percentiles, in milliseconds.
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+        stats = {'requests': self.requests, 'errors': self.errors, 'workers': self._jobs,
+                 'uptimeSeconds': round(time.time() - self._startTime, 3)}
+        for name, percentile in (('p50Ms', 50), ('p90Ms', 90), ('p99Ms', 99), ('maxMs', 100)):
+            stats[name] = round(_percentile(latencies, percentile) * 1000, 3) if latencies else None
+        return stats
+
+    # Returns a printable summary of the request statistics.
+    def report(self) -> str:
+        stats = self.stats()
+        output = 'Served ' + str(stats['requests']) + ' request(s), ' + str(stats['errors']) + ' failed.'
+        if stats['p50Ms'] is not None:
+            output += ' Latency p50 %.1fms, p90 %.1fms, p99 %.1fms, max %.1fms.' % (
+                stats['p50Ms'], stats['p90Ms'], stats['p99Ms'], stats['maxMs'])
+        return output
+
+    # Start listening, and serve until a SIGINT or SIGTERM arrives.
+    async def _serve(self) -> None:
+        stopping = asyncio.Event()
+        for signalNumber in (signal.SIGINT, signal.SIGTERM):
+            try:
+                asyncio.get_running_loop().add_signal_handler(signalNumber, stopping.set)
+            except NotImplementedError:
+                pass  # Windows; Ctrl+C raises a KeyboardInterrupt in run() instead
+
+        if self._socketPath is not None:
+            if os.path.exists(self._socketPath):  # Left behind by a server which did not shut down cleanly
+                os.remove(self._socketPath)
+            server = await asyncio.start_unix_server(self._handleConnection, path = self._socketPath)
+            address = self._socketPath
+        else:
+            server = await asyncio.start_server(self._handleConnection, self._host, self._port)
+            address = self._host + ':' + str(self._port)
+
+        print('Serving MUnit generation on ' + address + ' with ' + str(self._jobs)
+              + ' worker(s); press Ctrl+C to stop.')
+        try:
+            async with server:
+                await stopping.wait()
+        finally:
+            if self._socketPath is not None and os.path.exists(self._socketPath):
+                os.remove(self._socketPath)
+        print('Stopped serving.')
+
+    # Answer the requests sent on one connection until the client closes it.
+    async def _handleConnection(self, reader : asyncio.StreamReader, writer : asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    header = json.loads(line)
+                    command = header.get('command', 'generate')
+                except (ValueError, AttributeError):
+                    await self._respond(writer, {'status': 'error', 'error': 'Malformed request header'})
+                    break
+
+                if command == 'stats':
+                    await self._respond(writer, {'status': 'ok'}, json.dumps(self.stats()).encode('utf-8'))
+                elif command == 'generate':
+                    payload = await reader.readexactly(int(header.get('length', 0)))
+                    options = {key: header[key] for key in self.REQUEST_OPTIONS if key in header}
+                    await self._generate(writer, payload, header.get('name') or 'mule-config.xml', options)
+                else:
+                    await self._respond(writer, {'status': 'error', 'error': 'Unknown command: ' + str(command)})
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass  # The client went away mid-request
+        finally:
+            writer.close()
+
+    # Generate the suite for payload on a worker process with the request's options, and send it back.
+    async def _generate(self, writer : asyncio.StreamWriter, payload : bytes, name : str, options : dict) -> None:
+        startTime = time.perf_counter()
+        try:
+            suite = await asyncio.get_running_loop().run_in_executor(self._executor, _generateSuite, payload, name,
+                                                                     options)
+            header = {'status': 'ok'}
+        except Exception as exception:
+            suite = b''
+            header = {'status': 'error', 'error': type(exception).__name__ + ': ' + str(exception)}
+            self.errors += 1
+
+        seconds = time.perf_counter() - startTime
+        self.requests += 1
+        self._latencies.append(seconds)
+        header['seconds'] = round(seconds, 6)
+        await self._respond(writer, header, suite)
+
+    # Send a response header line, followed by payload.
+    async def _respond(self, writer : asyncio.StreamWriter, header : dict, payload : bytes = b'') -> None:
+        header['length'] = len(payload)
+        writer.write(json.dumps(header).encode('utf-8') + b'\n' + payload)
+        await writer.drain()
+
+# Returns the value at percentile (0 - 100) of the sorted list values, by the nearest-rank method.
+def _percentile(values : [], percentile : float) -> float:
+    rank = max(1, -(-len(values) * percentile // 100))  # Ceiling of len * percentile / 100
+    return values[int(rank) - 1]
+
+# The server's options in each worker process, set by _initializeWorker, the warm MuleLines for every set of
+# options requests asked for, keyed by (project, coverage, maxTestsPerFlow), and the FlowIndex of every project
+# requests asked for, keyed by (projectDir, glob).
+_workerOptions = None
+_workerMuleLines = {}
+_workerProjectIndexes = {}
+
+# Keep the FlowCache and server options used by _generateSuite in this process, and warm up a MuleLines with them.
+def _initializeWorker(cacheDir : str, cacheBytes : int, flowIndex : FlowIndex, coverage : str,
+                      maxTestsPerFlow : int) -> None:
+    global _workerOptions
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C stops the server, which then shuts the workers down
+    flowCache = FlowCache(cacheDir, cacheBytes) if cacheDir is not None else FlowCache()
+    _workerOptions = (flowCache, flowIndex, coverage, maxTestsPerFlow)
+    _workerMuleLines[(None, coverage, maxTestsPerFlow)] = MuleLines(flowCache, flowIndex, coverage, maxTestsPerFlow)
+
+# Returns the UTF-8 suite for the Mule config in payload, generated with the server's options overridden by
+# the request's options. Run on the worker processes.
+# Requests with the same options reuse one warm MuleLines, and every MuleLines in the worker shares its FlowCache.
+# Can raise a TypeError if the request's coverage options are invalid.
+def _generateSuite(payload : bytes, name : str, options : dict = None) -> bytes:
+    options = options or {}
+    flowCache, flowIndex, coverage, maxTestsPerFlow = _workerOptions
+    coverage = options.get('coverage', coverage)
+    maxTestsPerFlow = options.get('maxTestsPerFlow', maxTestsPerFlow)
+    project = None  # The server's own flow index
+    if 'projectDir' in options:
+        project = (options['projectDir'], options.get('glob') or '**/*.xml')
+        flowIndex = _projectIndex(*project)
+
+    key = (project, coverage, maxTestsPerFlow)
+    mule = _workerMuleLines.get(key)
+    if mule is None:
+        mule = _workerMuleLines[key] = MuleLines(flowCache, flowIndex, coverage, maxTestsPerFlow)
+    return mule.generate(payload, name, 'utf-8')
+
+# Returns the FlowIndex of the Mule project at projectDir brought up to date, or None if projectDir is None.
+# Each worker keeps the index of every project it was asked for, so only changed configs are read again.
+def _projectIndex(projectDir : str, pattern : str) -> FlowIndex:
+    if projectDir is None:
+        return None
+    flowIndex = _workerProjectIndexes.setdefault((projectDir, pattern), FlowIndex())
+    BatchGenerator(projectDir, projectDir, pattern).updateFlowIndex(flowIndex, GenerationMetrics())
+    return flowIndex
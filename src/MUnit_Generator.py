@@ -1,22 +1,179 @@
 import argparse
+import cProfile
+import json
+import os
+import sys
 import time
+from BatchGenerator import BatchGenerator
+from CoveragePlanner import CoveragePlanner
+from FlowCache import FlowCache
+from FlowIndex import FlowIndex
+from GenerationClient import GenerationClient
+from GenerationMetrics import GenerationMetrics
+from GenerationServer import GenerationServer
 from MuleLines import MuleLines
+from OutputFile import OutputFile
+from SuiteWatcher import SuiteWatcher
 
 ###########################
 # Author: Benjamin East
-# Last Updated: 06/25/2017
+# Last Updated: 10/18/2026
 ###########################
 
 # Main method for development/testing purposes
 def main() -> None:
-    parser = argparse.ArgumentParser()
-    parser.add_argument('--input', type = str, required = True, help = 'Input file name')
-    parser.add_argument('--output', type = str, required = True, help = 'Output file name')
+    parser = createArgumentParser()
     args = parser.parse_args()
+
+    if not args.cprofile:
+        generate(args)
+        return
+
+    # Profile the whole run, and write the stats even if it stops early
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        generate(args)
+    finally:
+        profiler.disable()
+        profiler.dump_stats(args.cprofile)
+        print('Wrote cProfile stats to ' + args.cprofile)
+
+# Returns the parser for the command line arguments.
+def createArgumentParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--input', type = str, help = 'Input file name')
+    parser.add_argument('--output', type = str, help = 'Output file name')
+    parser.add_argument('--input-dir', type = str,
+                        help = 'Mule project or folder to generate suites for; src/main/app is used if present')
+    parser.add_argument('--output-dir', type = str, help = 'Folder to write the generated suites to')
+    parser.add_argument('--glob', type = str, default = '**/*.xml',
+                        help = 'Pattern matched against files in --input-dir (default: **/*.xml)')
+    parser.add_argument('--jobs', type = int, default = None,
+                        help = 'Number of worker processes for --input-dir, or for converting the flows of a large '
+                        '--input (default: one per CPU)')
+    parser.add_argument('--cache-dir', type = str, default = '.munit-cache',
+                        help = 'Folder caching the MUnit code of unchanged flows between runs (default: .munit-cache)')
+    parser.add_argument('--cache-size', type = int, default = 64,
+                        help = 'Size limit of the flow cache in MB; least recently used flows are evicted (default: 64)')
+    parser.add_argument('--no-cache', action = 'store_true', help = 'Do not read or write the on-disk flow cache')
+    parser.add_argument('--watch', action = 'store_true',
+                        help = 'Keep running, and regenerate suites whenever their Mule configs change')
+    parser.add_argument('--watch-interval', type = float, default = 0.5,
+                        help = 'Seconds between checks for changed files in --watch mode (default: 0.5)')
+    parser.add_argument('--project-dir', type = str,
+                        help = 'Mule project whose flows --input may call through flow-refs '
+                        '(default: the Mule project holding --input, found by its src/main/app folder)')
+    parser.add_argument('--split-flows', type = int, default = 0, metavar = 'N',
+                        help = 'Write one suite per N flows, named <output>-<flow>.xml or <output>-partK.xml, '
+                        'instead of a single suite')
+    parser.add_argument('--shards', type = int, default = 0, metavar = 'N',
+                        help = 'Spread the generated tests across N suites of about the same estimated run time, '
+                        'named <output>-shardK.xml, and describe them in <output>-shards.json')
+    parser.add_argument('--coverage', choices = CoveragePlanner.STRATEGIES, default = CoveragePlanner.DEFAULT_STRATEGY,
+                        help = 'Which branches the tests of flows with several or nested choice blocks take: every '
+                        'branch at least once ("each", the default), every pair of branches of two different '
+                        'choices ("pairwise"), or every combination ("all")')
+    parser.add_argument('--max-tests-per-flow', type = int, default = CoveragePlanner.DEFAULT_MAX_TESTS, metavar = 'N',
+                        help = 'Generate at most N tests for any flow, whatever the --coverage (default: %d)'
+                        % CoveragePlanner.DEFAULT_MAX_TESTS)
+    parser.add_argument('--stream', action = 'store_true',
+                        help = 'Convert and write one flow at a time, so memory use stays bounded by the largest flow; '
+                        'for very large --input configs')
+    parser.add_argument('--profile', nargs = '?', const = 'text', choices = ('text', 'json'),
+                        help = 'Print phase timings and counters after generating; "json" prints them as JSON')
+    parser.add_argument('--cprofile', type = str, metavar = 'FILE',
+                        help = 'Profile the whole run with cProfile, and write the pstats file to FILE')
+    parser.add_argument('--serve', action = 'store_true',
+                        help = 'Keep running as a local generation server, answering --connect requests')
+    parser.add_argument('--connect', action = 'store_true',
+                        help = 'Generate --input on the running generation server; falls back to generating '
+                        'locally if the server cannot be reached')
+    parser.add_argument('--server-stats', action = 'store_true',
+                        help = 'Print the request counts and latency percentiles of the running generation server')
+    parser.add_argument('--host', type = str, default = GenerationServer.DEFAULT_HOST,
+                        help = 'Host of the generation server (default: ' + GenerationServer.DEFAULT_HOST + ')')
+    parser.add_argument('--port', type = int, default = GenerationServer.DEFAULT_PORT,
+                        help = 'TCP port of the generation server (default: ' + str(GenerationServer.DEFAULT_PORT) + ')')
+    parser.add_argument('--socket', type = str, metavar = 'PATH',
+                        help = 'Unix socket of the generation server, used instead of --host and --port')
+    return parser
+
+# Generate suites as requested by the parsed command line arguments.
+def generate(args : argparse.Namespace) -> None:
+    cacheDir = None if args.no_cache else args.cache_dir
+    cacheBytes = args.cache_size * 1024 * 1024
+    
+    if args.input_dir and not args.output_dir:
+        print('Please provide the folder to write the generated suites to using the --output-dir command.\n')
+        sys.exit(2)
     
-    if not args.input or not args.output:
+    if args.shards > 0 and args.split_flows > 0:
+        print('Please use only one of the --shards and --split-flows commands.\n')
+        sys.exit(2)
+    
+    if args.max_tests_per_flow < 1:
+        print('Please give --max-tests-per-flow a number above 0.\n')
+        sys.exit(2)
+    
+    if args.stream and (args.shards > 0 or args.split_flows > 0 or args.connect):
+        print('The --stream command writes a single suite locally, and cannot be used with --shards, '
+              '--split-flows or --connect.\n')
+        sys.exit(2)
+    
+    if args.serve:
+        # Index the project's flows once, so every request can resolve flow-refs into it
+        flowIndex = None
+        if args.project_dir:
+            flowIndex = FlowIndex.forCacheDir(cacheDir)
+            project = BatchGenerator(args.project_dir, args.project_dir, args.glob)
+            project.updateFlowIndex(flowIndex, GenerationMetrics())
+        server = GenerationServer(args.host, args.port, args.socket, args.jobs, cacheDir, cacheBytes, flowIndex,
+                                  args.coverage, args.max_tests_per_flow)
+        server.run()
+        return
+    
+    if args.server_stats:
+        client = GenerationClient(args.host, args.port, args.socket)
+        try:
+            print(json.dumps(client.stats(), indent = 2))
+        except OSError as error:
+            print('Could not reach the generation server: ' + str(error))
+            sys.exit(1)
+        finally:
+            client.close()
+        return
+    
+    if args.watch and (args.input_dir or (args.input and args.output)):
+        # Keep one flow cache for the whole session, so only changed flows are converted
+        flowCache = FlowCache(cacheDir, cacheBytes) if cacheDir is not None else FlowCache()
+        watcher = SuiteWatcher(flowCache, args.watch_interval, FlowIndex.forCacheDir(cacheDir), args.coverage,
+                               args.max_tests_per_flow)
+        if args.input_dir:
+            watcher.watchFolder(BatchGenerator(args.input_dir, args.output_dir, args.glob))
+        else:
+            watcher.watchFile(args.input, args.output)
+            projectDir = projectDirFor(args)
+            if projectDir is not None:
+                watcher.indexFolder(BatchGenerator(projectDir, projectDir, args.glob))
+        watcher.run()
+        
+    elif args.input_dir:
+        print('Generating MUnit Test Files...')
+        startTime = time.time()
+        
+        batch = BatchGenerator(args.input_dir, args.output_dir, args.glob, args.jobs, cacheDir, cacheBytes,
+                               args.split_flows, args.shards, args.coverage, args.max_tests_per_flow)
+        results = batch.run()
+        failures = batch.printSummary(results, time.time() - startTime)
+        printMetrics(batch.metrics, args.profile)
+        if failures:
+            sys.exit(1)
+        
+    elif not args.input or not args.output:
         print('Please provide the input file path and output file path using the --input and --output commands.\n')
         print('Please format the file paths as follows: C:/folder/filename or just filename\n\n')
+        print('To generate suites for a whole project, use the --input-dir and --output-dir commands instead.\n')
     else:
         inputFile = args.input
         outputFile = args.output
@@ -24,13 +181,100 @@ def main() -> None:
         print('Generating MUnit Test File...')
         startTime = time.time()
         
-        mule = MuleLines()
-        mule.parseMuleFileLines(inputFile)
-        mule.createMUnitTests()
-        mule.createMUnitSuiteFile(outputFile)
+        if args.connect and args.split_flows <= 0 and args.shards <= 0 and generateOnServer(args):
+            print('Finished.')
+            print('Total execution time: ', str(time.time() - startTime))
+            return
+        
+        flowCache = FlowCache(cacheDir, cacheBytes) if cacheDir is not None else None
+        
+        # Index the project's flows, so flow-refs to flows in other configs are mocked correctly
+        projectDir = projectDirFor(args)
+        flowIndex = FlowIndex.forCacheDir(cacheDir) if projectDir is not None else None
+        mule = MuleLines(flowCache, flowIndex, args.coverage, args.max_tests_per_flow)
+        if flowIndex is not None:
+            BatchGenerator(projectDir, projectDir, args.glob).updateFlowIndex(flowIndex, mule.metrics, [outputFile])
+        
+        if args.stream:
+            mule.streamMUnitSuiteFile(inputFile, outputFile)
+        else:
+            mule.parseMuleFileLines(inputFile)
+            mule.createMUnitTests(args.jobs)
+            if args.shards > 0:
+                outputFiles = mule.createMUnitSuiteShards(outputFile, args.shards, args.jobs)
+                print('Wrote ' + str(len(outputFiles)) + ' shard(s).')
+            elif args.split_flows > 0:
+                outputFiles = mule.createMUnitSuiteFiles(outputFile, args.split_flows, args.jobs)
+                print('Wrote ' + str(len(outputFiles)) + ' suite file(s).')
+            else:
+                mule.createMUnitSuiteFile(outputFile)
+        for unchangedFile in mule.unchangedFiles:
+            print('Unchanged, left as is: ' + unchangedFile)
     
         print('Finished.')
+        if flowCache is not None:
+            flowCache.prune()
+            print('Flows reused from cache: ' + str(flowCache.hits) + ' of ' + str(flowCache.hits + flowCache.misses))
         print('Total execution time: ', str(time.time() - startTime))
+        printMetrics(mule.metrics, args.profile)
+
+# Generate the --input suite on the generation server, and write it to --output. Returns false if the server
+# could not be reached, so the suite should be generated locally instead.
+def generateOnServer(args : argparse.Namespace) -> bool:
+    try:
+        with open(args.input, 'rb') as file:
+            payload = file.read()
+    except OSError:
+        print('Unable to read ' + args.input)
+        sys.exit(1)
+    
+    # Send the options a local run would use, so the server generates the same suite
+    projectDir = projectDirFor(args)
+    options = {'coverage': args.coverage, 'maxTestsPerFlow': args.max_tests_per_flow, 'glob': args.glob,
+               'projectDir': os.path.abspath(projectDir) if projectDir is not None else None}
+    client = GenerationClient(args.host, args.port, args.socket)
+    try:
+        suite = client.generate(payload, os.path.basename(args.input), options)
+    except OSError as error:
+        print('Could not reach the generation server (' + str(error) + '); generating locally.')
+        return False
+    except ValueError as error:
+        print('The generation server could not generate the suite: ' + str(error))
+        sys.exit(1)
+    finally:
+        client.close()
+    
+    try:
+        if not OutputFile.writeIfChanged(args.output, suite.decode('utf-8')):
+            print('Unchanged, left as is: ' + args.output)
+    except OSError as error:
+        print(error)
+        print('Please input a valid output file path.')
+    return True
+
+# Returns the Mule project folder which flow-refs of a single --input config are resolved against: --project-dir,
+# or else the project whose src/main/app holds --input or which the folder holding --input is the root of.
+# Returns None if --input is not part of a Mule project, so no other configs are indexed.
+def projectDirFor(args : argparse.Namespace) -> str:
+    if args.project_dir:
+        return args.project_dir
+    
+    inputFile = os.path.abspath(args.input)
+    folder = os.path.dirname(inputFile)
+    if os.path.isdir(os.path.join(folder, BatchGenerator.MULE_APP_FOLDER)):
+        return folder
+    while folder != os.path.dirname(folder):
+        folder = os.path.dirname(folder)
+        if inputFile.startswith(os.path.join(folder, BatchGenerator.MULE_APP_FOLDER, '')):
+            return folder
+    return None
+
+# Print metrics in the requested format; 'text', 'json', or None to print nothing.
+def printMetrics(metrics, profileFormat : str) -> None:
+    if profileFormat == 'json':
+        print(json.dumps(metrics.toDict(), indent = 2))
+    elif profileFormat == 'text':
+        print(metrics.report())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
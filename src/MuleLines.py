@@ -1,395 +1,613 @@
+import io
+import json
 import os
-import shlex
-import sys
-from collections import OrderedDict
+import re
+import threading
+from collections import ChainMap, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain, zip_longest
+from BranchView import BranchView
+from ConversionRules import ConversionRules
+from CoveragePlanner import CoveragePlanner
+from FlowCache import FlowCache
+from FlowIndex import FlowIndex
+from FlowSummary import FlowSummary
+from FrozenAttributes import FrozenAttributes
+from GenerationMetrics import GenerationMetrics
+from MuleParser import MuleParser
+from OutputFile import OutputFile
+from ShardPlanner import ShardPlanner
+from SuiteWriter import SuiteWriter
 from TagList import TagList
+from TagListView import TagListView
 from TagPair import TagPair
 
 ###########################
 # Author: Benjamin East
-# Last Updated: 07/01/2017
+# Last Updated: 10/18/2026
 ###########################
 
+# Version of the generated MUnit code. Bump it whenever conversion output changes, so that
+# flows cached by a FlowCache under an older version are converted again.
+GENERATOR_VERSION = '2.5'
+
 # A custom class to parse lines of Mule code and generate mUnit tests based on
 # a pre-existing base of XML Mule code.
 class MuleLines:
-    # Initialize a list for original mule XML code, and two 
-    # TagList objects for existing Mule code and MUnit code to be generated.
-    def __init__(self):
+    # Fewest Mule pairs in the flows to convert for createMUnitTests to use a process pool. Below this,
+    # starting the pool and sending the flows to it takes longer than converting them serially.
+    PARALLEL_MIN_PAIRS = 20000
+
+    # Initialize two TagList objects for existing Mule code and MUnit code to be generated.
+    # flowCache, if given, is used to reuse the MUnit code of flows which have not changed.
+    # flowIndex, if given, resolves flow-refs to flows defined in other configs of the project.
+    # coverage is the CoveragePlanner strategy choosing which branches the tests of flows with several or
+    # nested choice blocks take, and maxTestsPerFlow caps the number of tests generated for each flow.
+    # Phase timings and counters for everything done by this object are recorded in metrics.
+    # Can raise a TypeError if coverage is not a CoveragePlanner strategy or maxTestsPerFlow is not an int above 0.
+    def __init__(self, flowCache : FlowCache = None, flowIndex : FlowIndex = None,
+                 coverage : str = CoveragePlanner.DEFAULT_STRATEGY,
+                 maxTestsPerFlow : int = CoveragePlanner.DEFAULT_MAX_TESTS):
+        CoveragePlanner.checkOptions(coverage, maxTestsPerFlow)
+        self._flowCache = flowCache
+        self._flowIndex = flowIndex
+        self._coverage = coverage
+        self._maxTestsPerFlow = maxTestsPerFlow
+        self.metrics = GenerationMetrics()
+        self._metricsLock = threading.Lock()  # Guards metrics while generate() runs on several threads
+        self.reset()
+    
+    # Discard the parsed Mule code and generated MUnit code, so the object can be used for another config.
+    # The flow cache, flow index and metrics are kept.
+    def reset(self) -> None:
         self._inputFileName = ""
-        self._muleFileLines = []
         self._muleTagList = TagList()
         self._mUnitTagList = TagList()
+        self._mUnitHeaderEnd = 0  # Number of header pairs at the start of the mUnitTagList
+        self._mUnitFlowSpans = []  # (flow name, start, end, summary) of each flow's tests in the mUnitTagList
+        self._flowKinds = {}  # Flow name -> 'flow' or 'sub-flow', for resolving flow-refs
+        self.unchangedFiles = []  # Output files left alone because they already held the generated content
+    
+    # Generate the MUnit suite for a Mule config held in memory, and return it as a str, or as bytes
+    # if an encoding is given. source may be a str, bytes, or a binary or text stream. sourceName is the
+    # config's file name, used for the suite's spring:import.
+    # Each call works on its own state, so one instance can serve any number of calls, from any number
+    # of threads at once; they share only the flow cache, flow index and metrics of this instance.
+    # Can raise a ValueError if the source is not well-formed XML.
+    def generate(self, source, sourceName : str = 'mule-config.xml', encoding : str = None):
+        request = MuleLines(self._flowCache, self._flowIndex, self._coverage, self._maxTestsPerFlow)
+        request.parseMuleSource(source, sourceName)
+        request.createMUnitTests()
+        
+        suite = io.StringIO()
+        request._writeSuite(suite)
+        suite = suite.getvalue()
+        if encoding is not None:
+            suite = suite.encode(encoding)
+        request.metrics.count('bytesWritten', len(suite))  # Characters if no encoding was given
+        with self._metricsLock:
+            self.metrics.merge(request.metrics)
+        return suite
+        
+    # Create an MUnit TagList by parsing the Mule XML tags and properties from the TagList.
+    # With jobs above 1, or None for one per CPU, flows are converted on that many worker processes when the
+    # config is large enough to gain from it; the tests are still added in document order.
+    def createMUnitTests(self, jobs : int = 1) -> None:
+        metrics = self.metrics
+        self._mUnitTagList = TagList()  # Start over if tests were already created
+        self._mUnitFlowSpans = []
+        with metrics.phase('convert'):
+            self._generateMUnitDependencies()
+            self._mUnitHeaderEnd = len(self._mUnitTagList)
+            # isolateFlows returns an array of (TagListView, FlowSummary) tuples, one for each mule flow
+            with metrics.phase('isolate'):
+                flows = self._isolateFlows()
+                self._flowKinds = self._resolveFlowKinds()
+            metrics.count('flowsIsolated', len(flows))
+            
+            # Start and stop each server used by the flows once for the whole suite
+            rules = ConversionRules.default()
+            families = rules.connectorFamilies(summary for flow, summary in flows)
+            self._mUnitTagList.extend(rules.suiteSetup(families))
+            
+            workers = jobs if jobs else (os.cpu_count() or 1)
+            if workers > 1 and len(flows) > 1 and sum(len(flow) for flow, summary in flows) >= self.PARALLEL_MIN_PAIRS:
+                flowsMUnitPairs = self._convertFlowsInPool(flows, workers)
+            else:
+                flowsMUnitPairs = (self._mUnitPairsForFlow(flow, summary) for flow, summary in flows)
+            
+            for (flow, summary), mUnitPairs in zip(flows, flowsMUnitPairs):
+                start = len(self._mUnitTagList)
+                flowName = next(flow.iterPairs()).getAttribute('name')
+                self._mUnitTagList.extend(mUnitPairs)
+                self._mUnitFlowSpans.append((flowName, start, len(self._mUnitTagList), summary))
+
+            self._mUnitTagList.extend(rules.suiteTeardown(families))
+            self._mUnitTagList.append(_sharedPair('/mule', OrderedDict({'closeAtEnd': False})))
+        metrics.count('mUnitPairsEmitted', len(self._mUnitTagList))
+
+    # Generate the MUnit suite for the Mule XML file at inputFilePath and write it to a text stream, one flow at
+    # a time, without holding the whole config or suite in memory. The file is read twice: once for the suite
+    # header (spring internals, flow names and connectors used), and once to convert and write each flow as
+    # soon as it has been parsed, so memory is bounded by the largest flow rather than the whole document.
+    # The suite is the same as the one written by createMUnitTests and writeMUnitSuite.
+    # Returns the number of characters written, which are also counted as bytesWritten, since the stream's
+    # encoding is its own. Can raise a ValueError if the file is not well-formed XML.
+    def streamMUnitSuite(self, inputFilePath : str, stream) -> int:
+        written = self._streamSuite(inputFilePath, stream)
+        self.metrics.count('bytesWritten', written)
+        return written
+
+    # Write the suite for streamMUnitSuite, without counting the characters written.
+    def _streamSuite(self, inputFilePath : str, stream) -> int:
+        self.reset()
+        self._inputFileName = os.path.basename(inputFilePath)
+        metrics = self.metrics
+        rules = ConversionRules.default()
+        
+        families = self._scanSuiteDependencies(inputFilePath)
+        with metrics.phase('convert'):
+            self._generateMUnitDependencies()
+            header = self._mUnitTagList.pairs()
+            self._mUnitTagList = TagList()
+            self._muleTagList = TagList()
+            setup = rules.suiteSetup(families)
+            footer = rules.suiteTeardown(families) + [_sharedPair('/mule', OrderedDict({'closeAtEnd': False}))]
+        metrics.count('mUnitPairsEmitted', len(header) + len(setup) + len(footer))
         
-    # Create an MUnit TagList by parsing the Mule XML tags and properties from the TagList.        
-    def createMUnitTests(self) -> None:
-        self._generateMUnitDependencies()
-        # isolateFlows returns an array of TagLists, which are each a mule flow
-        for flow in self._isolateFlows():
+        suitePairs = chain(header, setup, self._streamFlowTests(inputFilePath), footer)
+        with metrics.phase('write'):
+            return SuiteWriter().write(suitePairs, stream)
 
-            if flow.containsTag('choice'):
-                # Convert operations in choice blocks to mUnit code
-                mUnitChoiceOperations = self._extractChoiceOperations(flow)
-                self._replaceChoiceBlocks(flow)
-                
-                # Generate multiple test flows if a choice block is present
-                for flow in self._generateMUnitTestFlows(mUnitChoiceOperations, flow):
-                    mUnitFlow = self._convertMuletoMUnit(flow)  # Convert each test flow to MUnit
-                    for pair in mUnitFlow.pairs():
-                        self._mUnitTagList.append(pair)
-                        
-            else:  # Otherwise, create a single test flow
-                mUnitFlow = self._convertMuletoMUnit(flow)
-                for pair in mUnitFlow.pairs():
-                    self._mUnitTagList.append(pair)
-
-        self._mUnitTagList.append(TagPair('/mule', OrderedDict({'closeAtEnd': False})))
-
-    # Converts the mUnitTagList to XML code and writes it to the provided outputFilePath.
-    def createMUnitSuiteFile(self, outputFilePath : str) -> None:
+    # Generate the MUnit suite for the Mule XML file at inputFilePath with streamMUnitSuite, and write it to
+    # outputFilePath, unless the file already holds the same suite; unchanged files are added to unchangedFiles.
+    # The suite is streamed to a temporary file next to outputFilePath, which then replaces it.
+    # Returns true if the file was written, and false if it was left unchanged or could not be written.
+    # Can raise a ValueError if the input file is not well-formed XML.
+    def streamMUnitSuiteFile(self, inputFilePath : str, outputFilePath : str) -> bool:
+        temporaryPath = OutputFile.temporaryPathFor(outputFilePath)
+        try:
+            with open(temporaryPath, 'x') as file:
+                self._streamSuite(inputFilePath, file)  # Counted once the file replaces the output file
+            with self.metrics.phase('write'):
+                written = OutputFile.replaceIfChanged(temporaryPath, outputFilePath)
+        except OSError as error:
+            print(OutputFile.namedError(error, outputFilePath) if error.filename == temporaryPath else error)
+            print('Please input a valid output file path.')
+            return False
+        finally:
+            if os.path.exists(temporaryPath):  # Left behind if generation failed
+                os.remove(temporaryPath)
+        self._countOutput(outputFilePath, written)
+        return written
+
+    # Returns a fingerprint of everything in the parsed Mule file which affects the generated suite:
+    # the file name, spring internals and flows. Formatting and comment changes leave it unchanged.
+    def suiteFingerprint(self) -> str:
+        suitePairs = [pair for pair in self._muleTagList.pairs() if 'spring' in pair.getTag()]
+        self._flowKinds = self._resolveFlowKinds()
+        flowRefVersions = []
+        for flow, summary in self._isolateFlows():
+            suitePairs.extend(flow.iterPairs())
+            flowRefVersions.append(self._flowRefVersion(summary))
+        return FlowCache.fingerprint(suitePairs, ':'.join(flowRefVersions) + ':' + self._inputFileName)
+
+    # Converts the mUnitTagList to XML code and writes it to the provided outputFilePath, unless the file
+    # already holds the same suite; unchanged files are added to unchangedFiles.
+    # Returns true if the file was written, and false if it was left unchanged or could not be written.
+    def createMUnitSuiteFile(self, outputFilePath : str) -> bool:
+        if self._mUnitTagList.isEmpty():
+            print('Unable to write to file; no tests available.')
+            print('Parse file lines using MuleLines.parseMuleFileLines(fileLines).')
+            print('Call MuleLines.createMUnitTests() to create the MUnit Tests for the file.')
+            return False
+        
+        suite = io.StringIO()
+        self._writeSuite(suite)
+        try:
+            with self.metrics.phase('write'):
+                written = OutputFile.writeIfChanged(outputFilePath, suite.getvalue())
+        except OSError as error:
+            print(error)
+            print('Please input a valid output file path.')
+            return False
+        self._countOutput(outputFilePath, written)
+        return written
+
+    # Converts the mUnitTagList to one suite per flow, or per flowsPerFile flows, and writes them to files
+    # named after outputFilePath, e.g. example-test-suite-exampleFlow.xml or example-test-suite-part1.xml.
+    # Every suite gets its own mule, munit:config and spring:beans header, and starts and stops the servers
+    # used by its own flows, so it can be run on its own.
+    # Suites are serialized and written on a pool of jobs threads (None picks a default).
+    # Returns the paths of the suites written or already up to date; flows which produced no tests get no suite.
+    def createMUnitSuiteFiles(self, outputFilePath : str, flowsPerFile : int = 1, jobs : int = None) -> []:
+        if self._mUnitTagList.isEmpty():
+            print('Unable to write to file; no tests available.')
+            print('Parse file lines using MuleLines.parseMuleFileLines(fileLines).')
+            print('Call MuleLines.createMUnitTests() to create the MUnit Tests for the file.')
+            return []
+        if not isinstance(flowsPerFile, int) or flowsPerFile < 1:
+            raise TypeError('flowsPerFile passed to MuleLines createMUnitSuiteFiles must be an int above 0')
+        
+        spans = [span for span in self._mUnitFlowSpans if span[2] > span[1]]
+        outputPaths = []
+        groups = []
+        usedPaths = set()
+        for first in range(0, len(spans), flowsPerFile):
+            group = spans[first:first + flowsPerFile]
+            if flowsPerFile == 1:
+                partName = group[0][0] or 'UnitTestFlow'
+            else:
+                partName = 'part' + str(first // flowsPerFile + 1)
+            outputPaths.append(_splitSuitePath(outputFilePath, partName, usedPaths))
+            groups.append(group)
+        return self._writeSuiteFiles(outputPaths, groups, jobs)
+
+    # Spreads the mUnitTagList's tests across up to shards suites with about the same estimated execution cost,
+    # keeping the tests of each flow together, and writes them to files named after outputFilePath,
+    # e.g. example-test-suite-shard1.xml. Each shard is self-contained, like the suites of createMUnitSuiteFiles.
+    # A manifest of the flows, tests and estimated cost of every shard is written to example-test-suite-shards.json.
+    # Returns the paths of the suites written or already up to date; configs with fewer flows than shards get
+    # one shard per flow.
+    def createMUnitSuiteShards(self, outputFilePath : str, shards : int, jobs : int = None) -> []:
         if self._mUnitTagList.isEmpty():
             print('Unable to write to file; no tests available.')
             print('Parse file lines using MuleLines.parseMuleFileLines(fileLines).')
             print('Call MuleLines.createMUnitTests() to create the MUnit Tests for the file.')
+            return []
+        if not isinstance(shards, int) or shards < 1:
+            raise TypeError('shards passed to MuleLines createMUnitSuiteShards must be an int above 0')
+        
+        pairs = self._mUnitTagList.pairs()
+        spans = [span for span in self._mUnitFlowSpans if span[2] > span[1]]
+        testCounts = [sum(1 for pair in pairs[start:end] if pair.getTag() == 'munit:test')
+                      for flowName, start, end, summary in spans]
+        costs = [ShardPlanner.flowCost(testCount, span[3]) for testCount, span in zip(testCounts, spans)]
+        
+        outputPaths = []
+        groups = []
+        manifest = []
+        usedPaths = set()
+        for shard, positions in enumerate(ShardPlanner.plan(costs, shards)):
+            outputPaths.append(_splitSuitePath(outputFilePath, 'shard' + str(shard + 1), usedPaths))
+            groups.append([spans[position] for position in positions])
+            manifest.append({
+                'file': os.path.basename(outputPaths[-1]),
+                'estimatedCost': round(sum(costs[position] for position in positions), 3),
+                'tests': sum(testCounts[position] for position in positions),
+                'flows': [{'name': spans[position][0], 'tests': testCounts[position],
+                           'estimatedCost': round(costs[position], 3)} for position in positions]})
+        writtenPaths = self._writeSuiteFiles(outputPaths, groups, jobs)
+        
+        manifestPath = os.path.splitext(outputFilePath)[0] + '-shards.json'
+        try:
+            written = OutputFile.writeIfChanged(manifestPath, json.dumps({'source': self._inputFileName,
+                                                                         'shards': manifest}, indent = 2))
+            self._countOutput(manifestPath, written)
+        except OSError as error:
+            print(error)
+            print('Unable to write ' + manifestPath)
+        return writtenPaths
+
+    # Writes one self-contained suite per group of flow spans to the matching path of outputPaths, on a pool of
+    # jobs threads. Each suite starts and stops the servers used by its own flows.
+    # Suites whose files already hold the same content are left unchanged, and added to unchangedFiles.
+    # Returns the paths of the suites written or already up to date.
+    def _writeSuiteFiles(self, outputPaths : [], groups : [], jobs : int = None) -> []:
+        pairs = self._mUnitTagList.pairs()
+        header = pairs[:self._mUnitHeaderEnd]
+        footer = pairs[-1:]  # The closing /mule pair
+        rules = ConversionRules.default()
+        
+        suites = []
+        for group in groups:
+            families = rules.connectorFamilies(span[3] for span in group)
+            tests = [pairs[start:end] for flowName, start, end, summary in group]
+            suites.append(chain(header, rules.suiteSetup(families), chain.from_iterable(tests),
+                                rules.suiteTeardown(families), footer))
+        
+        with self.metrics.phase('write'):
+            with ThreadPoolExecutor(max_workers = jobs) as executor:
+                results = list(executor.map(_writeSuiteFile, outputPaths, suites))
+        
+        writtenPaths = []
+        for outputPath, (written, error) in zip(outputPaths, results):
+            if error is None:
+                writtenPaths.append(outputPath)
+                self._countOutput(outputPath, written)
+            else:
+                print(error)
+                print('Unable to write ' + outputPath)
+        return writtenPaths
+
+    # Count an output file which was written, or record it as unchanged.
+    def _countOutput(self, outputFilePath : str, written : bool) -> None:
+        if written:
+            self.metrics.count('filesWritten')
+            self.metrics.count('bytesWritten', os.path.getsize(outputFilePath))
         else:
-            try:
-                file = open(outputFilePath, 'w+')
-            except IOError as error:
-                print(error.error())
-                print('Please input a valid output file path.')
-                return
-            except:
-                print('Unexpected error:', sys.exc_info()[0])
-                return
-            
-            # Write initial XML definition tag to file
-            file.write('<?xml version="1.0" encoding="UTF-8"?>\n\n')
-            tagDepth = 0
-            testNumber = 1
-            currentFlow = ""
-            
-            # Iterate through the TagPairs, create MUnit lines, and write them to the file.
-            for pair in self._mUnitTagList.pairs():
-                # Create a test number for flows with multiple test cases
-                if pair.getTag() == 'munit:test': 
-                    if currentFlow != pair.getAttribute('name'):
-                        currentFlow = pair.getAttribute('name')
-                        testNumber = 1
-                        
-                    else:
-                        testNumber += 1
-                        
-                # Create the MUnit file lines and write them to the output file.
-                mUnitLine = '<' + pair.getTag()
-                attributes = pair.getAttributes()
-                for attribute in pair.getAttributes():
-                    if pair.getTag() == 'munit:test' and attribute == 'name':
-                        mUnitLine = (mUnitLine + ' ' + attribute + '="' + attributes.get(attribute) 
-                                        + str(testNumber) + '"')
-                        
-                    elif attribute != 'closeAtEnd':
-                        mUnitLine = mUnitLine + ' ' + attribute + '="' + attributes.get(attribute) + '"'
-               
-                # Add closing braces depending on the tag type
-                if pair.getAttribute('closeAtEnd'):
-                        mUnitLine += '/>\n'
-                        
-                else:
-                    mUnitLine += '>\n'
-                    
-                # Insert an additional newline for readability
-                if (pair.getTag() == '/munit:test' or pair.getTag() == '/spring:beans' or 
-                    pair.getTag() == '/munit:before-suite' or pair.getTag() == '/munit:after-suite'):
-                    mUnitLine += '\n'
-                    
-                # Determine the indentation of current XML tag based on when blocks close
-                if pair.getTag()[0] != '/':
-                    file.write('\t' * tagDepth + mUnitLine)
-                    
-                if pair.getTag()[0] == '/':
-                    file.write('\t' * (tagDepth - 1) + mUnitLine)
-                    tagDepth -= 1
-                    
-                elif not pair.getAttribute('closeAtEnd'):
-                    tagDepth += 1
-            file.close()
-
-    # Parse XML lines of Mule code into the _muleTagList for this object.
+            self.metrics.count('filesUnchanged')
+            self.unchangedFiles.append(outputFilePath)
+
+    # Converts the mUnitTagList to XML code and writes it to a text stream, such as an open file,
+    # sys.stdout or an io.StringIO. Returns the number of characters written, which are also counted as
+    # bytesWritten, since the stream's encoding is its own.
+    def writeMUnitSuite(self, stream) -> int:
+        written = self._writeSuite(stream)
+        self.metrics.count('bytesWritten', written)
+        return written
+
+    # Write the suite for writeMUnitSuite, without counting the characters written.
+    def _writeSuite(self, stream) -> int:
+        with self.metrics.phase('write'):
+            return SuiteWriter().write(self._mUnitTagList.pairs(), stream)
+
+    # Parse the Mule XML file at inputFilePath into the _muleTagList for this object, replacing any
+    # config parsed before. Tags may span any number of lines; the file is read by the expat event parser.
+    # Can raise a ValueError if the file is not well-formed XML.
     def parseMuleFileLines(self, inputFilePath : str) -> None:
-        self._extractMuleFileLines(inputFilePath)
+        self.reset()
         self._inputFileName = os.path.basename(inputFilePath)  # Take only the filename
+        parser = MuleParser(self._muleTagList)
+        with self.metrics.phase('parse'):
+            parser.parseFile(inputFilePath)
+        self._countParsed(parser)
+
+    # Parse a Mule config held in memory into the _muleTagList for this object, replacing any config
+    # parsed before. source may be a str, bytes, or a binary or text stream; sourceName is its file name.
+    # Can raise a ValueError if the source is not well-formed XML.
+    def parseMuleSource(self, source, sourceName : str = 'mule-config.xml') -> None:
+        self.reset()
+        self._inputFileName = os.path.basename(sourceName)
+        parser = MuleParser(self._muleTagList)
+        with self.metrics.phase('parse'):
+            if isinstance(source, (str, bytes)):
+                parser.parseString(source, sourceName)
+            else:
+                parser.parseStream(source, sourceName)
+        self._countParsed(parser)
+
+    # First pass of streamMUnitSuite: read the Mule XML file at inputFilePath, keeping only its spring internals
+    # in the _muleTagList and the kinds of its flows in _flowKinds, one flow at a time.
+    # Returns the connector families used by the file's flows, in the order their rules were added.
+    def _scanSuiteDependencies(self, inputFilePath : str) -> []:
+        metrics = self.metrics
+        parser = MuleParser()
+        localKinds = {}
+        usage = FlowSummary()  # Collects the connectors used by every flow
+        summary = None  # Summary of the flow being read
         
-        for line in self._muleFileLines:
-            if line[0] == '<' and line[1] != '?' and line[1] != '!':
-                splitLine = shlex.split(line)  # Split the line; preserves spaces in quoted strings.
-                attrDict = OrderedDict()
+        chunks = parser.iterFileChunks(inputFilePath)
+        while True:
+            with metrics.phase('parse'):
+                pairs = next(chunks, None)
+            if pairs is None:
+                break
+            with metrics.phase('isolate'):
+                for pair in pairs:
+                    tag = pair.getTag()
+                    if 'spring' in tag:
+                        self._muleTagList.append(pair)
+                    if tag == 'flow' or tag == 'sub-flow':
+                        summary = FlowSummary()
+                        localKinds.update(FlowIndex.kindsInPairs((pair,)))
+                    if summary is not None:
+                        summary.observe(pair)
+                        if tag == '/flow' or tag == '/sub-flow':
+                            usage.allConnectors |= summary.allConnectors
+                            summary = None
+        
+        # The lines, pairs and flows are counted by the second pass, which reads the same file again
+        self._flowKinds = ChainMap(localKinds, self._flowIndex.kinds() if self._flowIndex is not None else {})
+        return ConversionRules.default().connectorFamilies((usage,))
+
+    # Second pass of streamMUnitSuite: parse the Mule XML file at inputFilePath again, and yield the MUnit pairs
+    # of each flow as soon as the flow has been read and converted. Only one flow is held at a time.
+    def _streamFlowTests(self, inputFilePath : str):
+        metrics = self.metrics
+        parser = MuleParser()
+        flowPairs = None  # Pairs of the flow being read
+        summary = None
+        
+        chunks = parser.iterFileChunks(inputFilePath)
+        while True:
+            with metrics.phase('parse'):
+                pairs = next(chunks, None)
+            if pairs is None:
+                break
+            for pair in pairs:
+                tag = pair.getTag()
+                if tag == 'flow' or tag == 'sub-flow':
+                    flowPairs = []
+                    summary = FlowSummary()
+                if flowPairs is None:
+                    continue
                 
-                if len(splitLine) > 1:  # Map additional attributes to attrDict
-                    for item in splitLine[1:]:  # Skip the tag in the line
-                        attrAndValue = item.split('=')
-                        
-                        # Add a closeAtEnd attribute, for use in writing the final output file
-                        if attrAndValue[1][-2:] == '/>':
-                            attrDict['closeAtEnd'] = True
-                            attrDict[attrAndValue[0]] = attrAndValue[1][:-2]  # Strip closing bracket
-                            
-                        elif attrAndValue[1][-1:] == '>':
-                            attrDict['closeAtEnd'] = False
-                            attrDict[attrAndValue[0]] = attrAndValue[1][:-1]  # Strip closing bracket
-                        
-                        else:  # Add to the dict if it's a middle attribute
-                            attrDict[attrAndValue[0]] = attrAndValue[1]
-                    
-                    self._muleTagList.append(TagPair(splitLine[0].lower().strip('<'), attrDict))
-                    
-                else:  # Add a closeAtEnd attribute, for use in writing the final output file
-                    if splitLine[0][:2] == '</':
-                        attrDict['closeAtEnd'] = False
-                    
-                    else:
-                        attrDict['closeAtEnd'] = True
-                    
-                    self._muleTagList.append(TagPair(splitLine[0].lower().strip('<').strip('>'), attrDict))
+                flowPairs.append(pair)
+                summary.observe(pair)
+                if tag == '/flow' or tag == '/sub-flow':
+                    with metrics.phase('convert'):
+                        mUnitPairs = self._mUnitPairsForFlow(TagList.fromPairs(flowPairs), summary)
+                    metrics.count('flowsIsolated')
+                    metrics.count('mUnitPairsEmitted', len(mUnitPairs))
+                    flowPairs = None
+                    summary = None
+                    yield from mUnitPairs
+        
+        self._countParsed(parser)
+
+    # Returns a list of the MUnit pairs for a flow, given as a TagList or TagListView, and its summary.
+    # The pairs are reused from the flow cache when the flow was converted before.
+    def _mUnitPairsForFlow(self, flow, summary : FlowSummary) -> []:
+        if self._flowCache is None:
+            return self._convertFlow(flow, summary).pairs()
+        
+        # Reuse the MUnit code generated for an identical flow on an earlier run
+        metrics = self.metrics
+        with metrics.phase('cache'):
+            cacheKey = FlowCache.fingerprint(flow.iterPairs(), self._flowRefVersion(summary))
+            mUnitPairs = self._flowCache.get(cacheKey)
+        if mUnitPairs is None:
+            mUnitPairs = self._convertFlow(flow, summary).pairs()
+            with metrics.phase('cache'):
+                self._flowCache.put(cacheKey, mUnitPairs)
+        else:
+            metrics.count('flowsFromCache')
+        return mUnitPairs
+
+    # Returns a list of the MUnit pairs for each of flows, a list of (TagListView, FlowSummary) tuples, in order.
+    # Flows found in the flow cache are reused, and the rest are converted on up to workers worker processes,
+    # or serially if they are too few to gain from it.
+    def _convertFlowsInPool(self, flows : [], workers : int) -> []:
+        metrics = self.metrics
+        flowsMUnitPairs = [None] * len(flows)
+        cacheKeys = [None] * len(flows)
+        if self._flowCache is not None:
+            with metrics.phase('cache'):
+                for position, (flow, summary) in enumerate(flows):
+                    cacheKeys[position] = FlowCache.fingerprint(flow.iterPairs(), self._flowRefVersion(summary))
+                    flowsMUnitPairs[position] = self._flowCache.get(cacheKeys[position])
+        
+        pending = [position for position, mUnitPairs in enumerate(flowsMUnitPairs) if mUnitPairs is None]
+        metrics.count('flowsFromCache', len(flows) - len(pending))
+        pendingFlows = [flows[position] for position in pending]
+        if len(pending) > 1 and sum(len(flow) for flow, summary in pendingFlows) >= self.PARALLEL_MIN_PAIRS:
+            # The flows and flow kinds are handed to each worker process once, when it starts, and only
+            # positions in pendingFlows are sent per flow; forked workers inherit them without pickling
+            workers = min(workers, len(pending))
+            with ProcessPoolExecutor(max_workers = workers, initializer = _initializeConversionWorker,
+                                     initargs = (pendingFlows, dict(self._flowKinds), self._coverage,
+                                                 self._maxTestsPerFlow)) as executor:
+                converted = list(executor.map(_convertFlowInWorker, range(len(pendingFlows)),
+                                              chunksize = max(1, len(pending) // (workers * 4))))
+            for mUnitPairs, workerMetrics in converted:
+                metrics.merge(workerMetrics)
+            converted = [mUnitPairs for mUnitPairs, workerMetrics in converted]
+        else:
+            converted = [self._convertFlow(flow, summary).pairs() for flow, summary in pendingFlows]
+        
+        for position, mUnitPairs in zip(pending, converted):
+            flowsMUnitPairs[position] = mUnitPairs
+            if self._flowCache is not None:
+                with metrics.phase('cache'):
+                    self._flowCache.put(cacheKeys[position], mUnitPairs)
+        return flowsMUnitPairs
+
+    # Add the lines and pairs read by parser to the metrics.
+    def _countParsed(self, parser : MuleParser) -> None:
+        self.metrics.count('linesRead', parser.linesRead)
+        self.metrics.count('tagPairsCreated', parser.pairsCreated)
     
-    # Convert a mule flow to a TagList of MUnit code.
+    # Convert a mule flow, given as a TagList, TagListView or BranchView, to a TagList of MUnit code.
+    # Each tag is converted by the handler registered for it in ConversionRules.
+    # summary describes the flow; it is built here if not given. Choice blocks must already have been
+    # replaced with a choicePlaceholder, or they are replaced here first.
     # Can raise a TypeError if incorrect parameter types are provided.
-    def _convertMuletoMUnit(self, muleFlowTagList : TagList) -> TagList:
-        if not isinstance(muleFlowTagList, TagList):
+    def _convertMuletoMUnit(self, muleFlowTagList, summary : FlowSummary = None) -> TagList:
+        if not isinstance(muleFlowTagList, (TagList, TagListView, BranchView)):
             raise TypeError('Invalid parameter passed to MuleLines _convertMuletoMUnit')
-        self._replaceChoiceBlocks(muleFlowTagList)  # Replace choice blocks with choicePlaceholder
+        if summary is None and isinstance(muleFlowTagList, BranchView):
+            summary = FlowSummary.fromPairs(muleFlowTagList.iterPairs())
+        elif summary is None or summary.choiceSpans():
+            if isinstance(muleFlowTagList, TagListView):  # Replace in a copy, leaving the parsed config intact
+                muleFlowTagList = TagList.fromPairs(muleFlowTagList.iterPairs())
+            self._replaceChoiceBlocks(muleFlowTagList, summary)  # Replace choice blocks with choicePlaceholder
+            summary = FlowSummary.fromPairs(muleFlowTagList.iterPairs())
         
-        # Values used for tracking info throughout the method
-        muleFlowName = ""
-        mUnitTagList = TagList()
-        afterChoiceBlock = True  # Used to determine certain tag types
-        flowContainsDatabase = False  # Used to create before and after flows for DB mocking
-        flowContainsFTP = False
-        
-        # Define generic OrderedDicts for commonly used tag attributes
-        noAttributes = OrderedDict({'closeAtEnd': False})
-        mockReturn = OrderedDict({'closeAtEnd': False, 'payload': '#[]'})
-        mockAttribute = OrderedDict({'closeAtEnd': True, 'name': 'name'})
-        mockWhen = OrderedDict({'closeAtEnd': False, 'doc:name': 'Mock'})
-                
-        # Iterate through the Mule XML tags and attributes to create MUnit tags and attributes.
-        if muleFlowTagList.containsTag('choicePlaceholder'):
-            afterChoiceBlock = False
-
-        # Check if a DB connector is in the flow
-        if (muleFlowTagList.containsTag('db:select') or muleFlowTagList.containsTag('db:insert') or
-             muleFlowTagList.containsTag('db:update') or muleFlowTagList.containsTag('db:delete') or 
-             muleFlowTagList.containsTag('db:stored-procedure') or muleFlowTagList.containsTag('db:bulk-execute')
-             or muleFlowTagList.containsTag('db:execute-ddl')):
-            
-            flowContainsDatabase = True
-            
-            # Create before suite block to start a DB mock
-            beforeAttributes = OrderedDict({'closeAtEnd': False, 'name': 'before-DB',
-                                            'description': 'Start DB Server'})
-            mUnitTagList.append(TagPair('munit:before-suite', beforeAttributes))
-            
-            startAttributes = OrderedDict({'closeAtEnd': True, 'config-ref': '', 'doc:name': 'Start DB'})
-            mUnitTagList.append(TagPair('dbserver:start-db-server', startAttributes))
-            mUnitTagList.append(TagPair('/munit:before-suite', noAttributes))
-            
-        # Check if FTP connector is in the flow
-        if muleFlowTagList.containsTag('ftp:outbound-endpoint'):
-            flowContainsFTP = True
-            
-            # Add FTP before-suite block to start an FTP mock
-            beforeAttributes = OrderedDict({'closeAtEnd': False, 'name': 'before-FTP',
-                                            'description': 'Start DB Server'})
-            mUnitTagList.append(TagPair('munit:before-suite', beforeAttributes))
-            startAttributes = OrderedDict({'closeAtEnd': True, 'config-ref': '', 'doc:name': 'Start FTP'})
-            mUnitTagList.append(TagPair('dbserver:start-db-server', startAttributes))
-            mUnitTagList.append(TagPair('/munit:before-suite', noAttributes))
-            
-        # Iterate the TagPairs in the mule flow
-        flowPairs = muleFlowTagList.pairs()
-        for pair in flowPairs:
-            muleAttributes = pair.getAttributes()  # Attributes for the given Mule XML tag
-            
-            # Handle choicePlaceholder tag       
-            if pair.getTag() == 'choicePlaceholder':
-                afterChoiceBlock = True
-                muleFlowTagList.remove(pair)
-                
-                # Insert flow ref to Mule flow
-                flowRef = OrderedDict({'closeAtEnd': True, 'name': muleFlowName, 'doc:name': 
-                                       'Flow-ref to ' + muleFlowName})
-                mUnitTagList.append(TagPair('flow-ref', flowRef))
-            
-            # Handle flow tag
-            elif pair.getTag() == 'flow':
-                flowAttributes = OrderedDict({'closeAtEnd': False})
-                
-                if 'name' in muleAttributes:  # Get the name, store it and set MUnit test name
-                    muleFlowName = muleAttributes.get('name')
-                    flowAttributes['name'] = muleAttributes.get('name') + '-test-'
-                    flowAttributes['description'] = 'Unit Test for ' + muleAttributes.get('name')
-                
-                else:  # Set generic MUnit test name
-                    flowAttributes['name'] = 'UnitTestFlow'
-                    flowAttributes['description'] = 'Unit Test Flow for unnamed Mule Flow'
-                    
-                mUnitTagList.append(TagPair('munit:test', flowAttributes)) 
-                
-                # Place a mock payload if a payload isn't set at the start of the flow 
-                nextPairTag = flowPairs[flowPairs.index(pair) + 1].getTag() 
-                if (nextPairTag != 'set-payload' and nextPairTag != 'http:listener' 
-                    and not 'inbound-endpoint' in nextPairTag):
-                    
-                    setAttributes = OrderedDict({'closeAtEnd': True, 'payload': '',
-                                                 'doc:name': 'Set Initial Test Payload'})
-                    mUnitTagList.append(TagPair('munit:set', setAttributes))
-                        
-            # Handle flow-ref tag       
-            elif pair.getTag() == 'flow-ref':  # Create MUnit structure for flow ref
-                # Mock flow-ref to sub-flow
-                if ('subflow' in muleAttributes['name'].lower() or 'sub-flow' in muleAttributes['name'].lower()
-                    or 'sub_flow' in muleAttributes['name'].lower() or 'sub flow' in muleAttributes['name'].lower()):
-                   
-                    mockVerify = OrderedDict({'closeAtEnd': False, 'messageProcessor': 'mule:sub-flow',
-                                              'doc:name': 'Verify Call', 'times': '1'})
-                    mUnitTagList.append(TagPair('mock:verify-call', mockVerify))
-                    mUnitTagList.append(TagPair('mock:with-attributes', noAttributes))
-                    
-                    mockAttributeCopy = mockAttribute.copy()
-                    mockAttributeCopy['whereValue'] = "#[matchContains('" + muleAttributes['name'] + "')]"
-                    mUnitTagList.append(TagPair('mock:with-attribute', mockAttributeCopy))
-                    
-                    mUnitTagList.append(TagPair('/mock:with-attributes', noAttributes))
-                    mUnitTagList.append(TagPair('/mock:verify-call', noAttributes))
-                    
-                else:  # Mock flow-ref to flow
-                    mockWhenCopy = mockWhen.copy()
-                    mockWhenCopy['messageProcessor'] = 'mule:flow'
-                    mUnitTagList.append(TagPair('mock:when', mockWhenCopy))
-                    mUnitTagList.append(TagPair('mock:with-attributes', noAttributes))
-                
-                    mockAttributeCopy = mockAttribute.copy()
-                    mockAttributeCopy['whereValue'] = "#['" + muleAttributes['name'] + "']"
-                    mUnitTagList.append(TagPair('mock:with-attribute', mockAttributeCopy))
-                    mUnitTagList.append(TagPair('/mock:with-attributes', noAttributes))
-                    
-                    mUnitTagList.append(TagPair('mock:then-return', mockReturn))
-                    mUnitTagList.append(TagPair('mock:invocation-properties', noAttributes))
-                    
-                    # Leave key and value blank, until it's clear how to accurately populate them
-                    mockProperty = OrderedDict({'closeAtEnd': True, 'key': '', 'value': ''})
-                    mUnitTagList.append(TagPair('mock:invocation-property', mockProperty))
-                    
-                    mUnitTagList.append(TagPair('/mock:invocation-properties', noAttributes))
-                    mUnitTagList.append(TagPair('/mock:then-return', noAttributes))
-                    mUnitTagList.append(TagPair('/mock:when', noAttributes))
-            
-            # Handle ftp:outbound-endpoint tag
-            elif pair.getTag() == 'ftp:outbound-endpoint':
-                ftpAttributes = OrderedDict({'closeAtEnd': True, 'file': pair.getAttribute('outputPattern'),
-                                             'path': pair.getAttribute('path'), 'config-ref': ''})
-                mUnitTagList.append(TagPair('ftpserver:contains-files', ftpAttributes))
-                        
-            # If at the entrance point to the flow, set a payload if one isn't set after
-            elif 'inbound-endpoint' in pair.getTag() or pair.getTag() == 'http:listener':
-                if not flowPairs[flowPairs.index(pair) + 1].getTag() == 'set-payload':
-                    
-                    setAttributes = OrderedDict({'closeAtEnd': True, 'payload': '',
-                                                 'doc:name': 'Set Initial Test Payload'})
-                    mUnitTagList.append(TagPair('munit:set', setAttributes))
-
-            # Handle set-payload tag
-            elif pair.getTag() == 'set-payload':
-                if afterChoiceBlock:  # Assert payload value
-                    
-                    assertPayload = OrderedDict({'closeAtEnd': True, 'message': 'Incorrect payload!',
-                                                 'expectedValue': muleAttributes['value']})
-                    mUnitTagList.append(TagPair('munit:assert-payload-equals', assertPayload))
-                    
-                else:  # if before choice block, mock payload value
-                    mockWhenCopy = mockWhen.copy()
-                    mockWhenCopy['messageProcessor'] = 'mule:set-payload'
-                    mUnitTagList.append(TagPair('mock:when', mockWhenCopy))
-                    mUnitTagList.append(TagPair('mock:with-attributes', noAttributes))
-                    
-                    mockAttributeCopy = mockAttribute.copy()
-                    mockAttributeCopy['whereValue'] = "#['Set Original Payload']"
-                    mockAttributeCopy['name'] = 'doc:name'
-                    mUnitTagList.append(TagPair('mock:with-attribute', mockAttributeCopy))
-                    mUnitTagList.append(TagPair('/mock:with-attributes', noAttributes))
-
-                    mockReturnCopy = mockReturn.copy()
-                    mockReturnCopy['closeAtEnd'] = True
-                    mUnitTagList.append(TagPair('mock:then-return', mockReturnCopy))
-                    mUnitTagList.append(TagPair('/mock:when', noAttributes))
- 
-            # Handle /flow tag 
-            elif pair.getTag() == '/flow':
-                mUnitTagList.append(TagPair('/munit:test', noAttributes))    
-                
-                # Add DB after-suite case
-                if flowContainsDatabase:  # Create mUnit after-suite code to stop the database
-                    
-                    afterAttributes = OrderedDict({'closeAtEnd': False, 'name': muleFlowName + '-After_Suite_DB',
-                                                   'description': 'Stop DB Server'})
-                    mUnitTagList.append(TagPair('munit:after-suite', afterAttributes))
-                    
-                    stopAttributes = OrderedDict({'closeAtEnd': True, 'config-ref': '',
-                                                  'doc:name': 'Stop Server'})
-                    mUnitTagList.append(TagPair('dbserver:stop-db-server', stopAttributes))
-                    mUnitTagList.append(TagPair('/munit:after-suite', noAttributes))
-                
-                # Add FTP after-suite case
-                if flowContainsFTP:
-                    
-                    afterAttributes = OrderedDict({'closeAtEnd': False, 'name': muleFlowName + '-After_Suite_FTP',
-                                                   'description': 'Stop FTP Server'})
-                    mUnitTagList.append(TagPair('munit:after-suite', afterAttributes))
-                    
-                    stopAttributes = OrderedDict({'closeAtEnd': True, 'config-ref': ''})
-                    mUnitTagList.append(TagPair('ftpserver:stop-server', stopAttributes))
-                    mUnitTagList.append(TagPair('/munit:after-suite', noAttributes))
-            
-            # Handle /mule tag
-            elif pair.getTag() == '/mule':
-                mUnitTagList.append(TagPair('/mule', noAttributes))
-                
-        return mUnitTagList
+        return ConversionRules.default().convert(muleFlowTagList.iterPairs(), summary, self._flowKinds)
     
-    # Extracts operations performed in a choice block in the provided flow.
-    # Returns a TagList containing the choice operations.
+    # Extracts the operations performed in the choice blocks of the provided flow, a TagList or TagListView.
+    # summary describes the flow, giving the spans of its blocks; it is built here if not given.
+    # Returns a list holding, for each choice block which is not nested in another, the list of its alternatives:
+    # the operations a test takes through the block, those of one when or otherwise case. Choices nested in a
+    # case are resolved to one of their own alternatives, combined by the coverage strategy. Alternatives are
+    # TagListViews sliced out of the flow's own pairs, or lists of pairs where a nested choice was resolved.
     # Can raise a TypeError if an incorrect parameter type is provided.
-    def _extractChoiceOperations(self, flowTagList : TagList) -> []:
-        if not isinstance(flowTagList, TagList):
+    def _extractChoiceOperations(self, flowTagList, summary : FlowSummary = None) -> []:
+        if not isinstance(flowTagList, (TagList, TagListView)):
             raise TypeError('Invalid parameter type passed to MuleLines _extractChoiceOperations')
+        if summary is None:
+            summary = FlowSummary.fromPairs(flowTagList.iterPairs())
         
-        choiceOperations = []
-        caseOperations = TagList()
-        inChoiceClause = False
-        for pair in flowTagList.pairs():
-            if pair.getTag() == 'when' or pair.getTag() == 'otherwise':
-                inChoiceClause = True
-                
-            elif pair.getTag() == '/when' or pair.getTag() == '/otherwise':
-                inChoiceClause = False
-                choiceOperations.append(caseOperations.copy())
-                caseOperations.clear()
-                
-            elif inChoiceClause:
-                caseOperations.append(pair)
-                
-        return choiceOperations
+        pairs = flowTagList.pairs()
+        return [self._choiceAlternatives(flowTagList, pairs, summary, start, end)
+                for start, end in _outerSpans(summary.choiceSpans(), 0, len(pairs))]
+    
+    # Returns the alternatives of the choice block from start to end in flow, whose pairs are given as a list.
+    # The alternatives of its cases are taken in turn, the first of every case before the second of any, so
+    # each case is still covered when there are more alternatives than the test cap.
+    def _choiceAlternatives(self, flow, pairs : [], summary : FlowSummary, start : int, end : int) -> []:
+        end = len(pairs) if end is None else end
+        caseAlternatives = []
+        position = start + 1
+        while position < end:
+            caseEnd = summary.blockEnd(position)
+            if pairs[position].getTag() in FlowSummary.BRANCH_TAGS:
+                caseAlternatives.append(self._rangeAlternatives(flow, pairs, summary, position + 1, caseEnd))
+            position = caseEnd + 1
+        
+        if not caseAlternatives:  # A choice without cases does nothing
+            return [[]]
+        alternatives = [alternative for turn in zip_longest(*caseAlternatives, fillvalue = _NO_ALTERNATIVE)
+                        for alternative in turn if alternative is not _NO_ALTERNATIVE]
+        return alternatives[:self._maxTestsPerFlow]
+    
+    # Returns the alternatives of the operations from start up to end in flow, whose pairs are given as a list:
+    # a TagListView of them if they hold no choice block, and otherwise lists of the operations with each
+    # choice block replaced by one of its alternatives, as chosen by the coverage strategy.
+    def _rangeAlternatives(self, flow, pairs : [], summary : FlowSummary, start : int, end : int) -> []:
+        choiceSpans = _outerSpans(summary.choiceSpans(), start, end)
+        if not choiceSpans:
+            return [flow.view(start, end)]
+        
+        choices = [self._choiceAlternatives(flow, pairs, summary, choiceStart, choiceEnd)
+                   for choiceStart, choiceEnd in choiceSpans]
+        alternatives = []
+        for combination in CoveragePlanner.combinations([len(choice) for choice in choices], self._coverage,
+                                                        self._maxTestsPerFlow):
+            operations = []
+            position = start
+            for (choiceStart, choiceEnd), choice, alternative in zip(choiceSpans, choices, combination):
+                operations.extend(pairs[position:choiceStart])
+                operations.extend(choice[alternative])
+                position = choiceEnd + 1 if choiceEnd is not None else end
+            operations.extend(pairs[position:end])
+            alternatives.append(operations)
+        return alternatives
+    
+    # Convert a single Mule flow to MUnit code, generating one test per choice case if the flow has
+    # choice blocks. Returns a TagList of every MUnit test flow generated for it.
+    # flow may be a TagListView of the parsed config; flows with choice blocks are copied before they are changed.
+    def _convertFlow(self, flow, summary : FlowSummary) -> TagList:
+        if not summary.choiceSpans():  # Create a single test flow
+            return self._convertMuletoMUnit(flow, summary)
+        
+        # Convert operations in choice blocks to mUnit code
+        with self.metrics.phase('expand'):
+            mUnitChoiceOperations = self._extractChoiceOperations(flow, summary)
+            # The choice operations may be views of the flow's own pairs, so replace blocks in a copy
+            flow = TagList.fromPairs(flow.iterPairs())
+            self._replaceChoiceBlocks(flow, summary)
+        self.metrics.count('branchesExpanded', sum(len(alternatives) for alternatives in mUnitChoiceOperations))
+        
+        # Generate multiple test flows if a choice block is present. Test flows are generated lazily,
+        # one at a time, and each is summarized from the flow's summary and the branches it takes.
+        # Branches which perform the same operations give identical tests, so only the first of those is kept.
+        mUnitTagList = TagList()
+        testFlows = self._generateMUnitTestFlows(mUnitChoiceOperations, flow)
+        # Tests are grouped by length, so they are only fingerprinted when another test could be equal.
+        convertedTests = {}  # Number of pairs -> list of the tests of that length
+        for branches, testFlow in testFlows:
+            testSummary = summary.withBranch(FlowSummary.fromPairs(chain.from_iterable(branches)))
+            mUnitTest = self._convertMuletoMUnit(testFlow, testSummary)  # Convert each test flow
+            sameLength = convertedTests.setdefault(len(mUnitTest), [])
+            if mUnitTest in sameLength:
+                self.metrics.count('duplicateTestsDropped')
+                continue
+            sameLength.append(mUnitTest)
+            mUnitTagList.extend(mUnitTest.pairs())
+        return mUnitTagList
     
-    # Reads the specified file and returns a list of file lines.
-    # Splits whitespace and takes only lines beginning in tags
-    def _extractMuleFileLines(self, inputFilePath : str) -> None:
-        with open(inputFilePath, 'r') as file:
-            self._muleFileLines = file.readlines()
-        self._muleFileLines = list(filter(None, [x.lstrip(' ').strip() for x in self._muleFileLines]))
-       
-        for line in self._muleFileLines:
-            if line[0] != "<":
-                self._muleFileLines.remove(line)
-
     # Extracts all spring imports and values from the Mule TagList and adds them to the MUnit TagList
     def _extractSpringInternals(self) -> None:
         for pair in self._muleTagList.pairs():
@@ -416,85 +634,166 @@ class MuleLines:
     http://www.mulesoft.org/schema/mule/munit/current/mule-munit.xsd http://www.springframework.org/schema/beans 
     http://www.springframework.org/schema/beans/spring-beans-current.xsd http://www.mulesoft.org/schema/mule/core 
     http://www.mulesoft.org/schema/mule/core/current/mule.xsd"""
-        self._mUnitTagList.append(TagPair('mule', muleAttributes))
+        self._mUnitTagList.append(_sharedPair('mule', muleAttributes))
         
         # Set munit:config tag and attributes
         configAttributes = OrderedDict({'closeAtEnd': True, 'name': 'munit', 'doc:name': 'Munit Configuration'})
-        self._mUnitTagList.append(TagPair('munit:config', configAttributes))
+        self._mUnitTagList.append(_sharedPair('munit:config', configAttributes))
         
         # Set spring tags and attributes
-        self._mUnitTagList.append(TagPair('spring:beans', OrderedDict({'closeAtEnd': False})))
+        self._mUnitTagList.append(_sharedPair('spring:beans', OrderedDict({'closeAtEnd': False})))
         
         # Add a spring import for the file we're testing, and copy any spring internal values from the file
         springInternalAttributes = OrderedDict({'closeAtEnd': True, 'resource': 
                                                 'classpath:' + self._inputFileName})
-        self._mUnitTagList.append(TagPair('spring:import', springInternalAttributes))
+        self._mUnitTagList.append(_sharedPair('spring:import', springInternalAttributes))
         
         self._extractSpringInternals()  # Extract spring tags and insert them into the MUnit TagList
-        self._mUnitTagList.append(TagPair('/spring:beans', OrderedDict({'closeAtEnd': False})))
+        self._mUnitTagList.append(_sharedPair('/spring:beans', OrderedDict({'closeAtEnd': False})))
         
-    # Generates MUnit Test Flows given the operations performed in a choice block 
-    # and a TagList of a flow containing a choicePlaceholder tag.
+    # Generates MUnit Test Flows given the alternatives of each choice block, as returned by
+    # _extractChoiceOperations, and a TagList of a flow with a choicePlaceholder tag per choice block.
+    # The coverage strategy chooses which alternative of each block every test flow takes, up to the test cap.
+    # Yields (list of the alternatives taken, BranchView) tuples rather than copying the flow for each test.
+    # The base TagList must not be changed until every view has been consumed.
     # Can raise a type error if invalid parameter types are provided.
-    def _generateMUnitTestFlows(self, choiceOperations : [], mUnitBaseTagList : TagList) -> []:
+    def _generateMUnitTestFlows(self, choiceOperations : [], mUnitBaseTagList : TagList):
         if not isinstance(choiceOperations, list) or not isinstance(mUnitBaseTagList, TagList):
             raise TypeError('Invalid parameter types passed to MuleLines _generateMUnitTestFlows')
-        outputFlows = []
+        return self._iterateMUnitTestFlows(choiceOperations, mUnitBaseTagList)
+    
+    # Generator behind _generateMUnitTestFlows, so its parameters are checked when it is called.
+    def _iterateMUnitTestFlows(self, choiceOperations : [], mUnitBaseTagList : TagList):
+        basePairs = mUnitBaseTagList.pairs()  # One shallow copy, shared by every view
+        placeholderIndexes = [position for position, pair in enumerate(basePairs)
+                              if pair.getTag() == 'choicePlaceholder']
         
-        # Create a flow for each choice operation. (Later support should include multiple operations)
-        for choiceTagList in choiceOperations:
-            mUnitCopy = mUnitBaseTagList.copy()
-            pair = mUnitCopy.getPair('choicePlaceholder')
-            pairIndex = mUnitCopy.index(pair)
-            
-            for choicePair in choiceTagList.pairs():
-                pairIndex += 1  # Increment index for each pair to maintain correct order
-                mUnitCopy.insertAtIndex(pairIndex, choicePair)
-            outputFlows.append(mUnitCopy)    
-             
-        return outputFlows
-        
-    # Iterates through the muleTagList and returns a list of TagLists, where each
-    # returned TagList is a mule flow.
+        for combination in CoveragePlanner.combinations([len(alternatives) for alternatives in choiceOperations],
+                                                        self._coverage, self._maxTestsPerFlow):
+            branches = [alternatives[alternative] for alternatives, alternative in zip(choiceOperations, combination)]
+            yield (branches, BranchView(basePairs, placeholderIndexes, branches))
+        
+    # Iterates through the muleTagList and returns a list of (TagListView, FlowSummary) tuples, where each
+    # view is a mule flow sharing the muleTagList's pairs, and each FlowSummary is built in the same pass.
     def _isolateFlows(self) -> []:
         flows = []
-        inFlow = False
-        flowList = TagList()
+        flowStart = None
+        summary = None
         
-        for pair in self._muleTagList.pairs():
-            # If within a flow or sub-flow block, add the pair to the outputList
+        for position, pair in enumerate(self._muleTagList.iterPairs()):
+            # If within a flow or sub-flow block, add the pair to the flow's summary
             if pair.getTag() == 'flow' or pair.getTag() == 'sub-flow':
-                inFlow = True
-                flowList.append(pair)
+                flowStart = position
+                summary = FlowSummary()
+                summary.observe(pair)
                 
-            elif pair.getTag() == '/flow' or pair.getTag() == '/sub-flow':
-                flowList.append(pair)
-                flows.append(flowList.copy())
-                flowList.clear()  # Clear the flowList to handle next flow
-                inFlow = False
+            elif (pair.getTag() == '/flow' or pair.getTag() == '/sub-flow') and flowStart is not None:
+                summary.observe(pair)
+                flows.append((self._muleTagList.view(flowStart, position + 1), summary))
+                flowStart = None
                 
-            elif inFlow:
-                flowList.append(pair)
+            elif flowStart is not None:
+                summary.observe(pair)
                 
         return flows
     
-    # Replace choice blocks in the mule TagList with a choice placeholder.
+    # Returns a mapping of flow names to their kinds: the flows of the parsed file first, then those of
+    # the project's FlowIndex, if any.
+    def _resolveFlowKinds(self) -> ChainMap:
+        localKinds = FlowIndex.kindsInPairs(self._muleTagList.iterPairs())
+        return ChainMap(localKinds, self._flowIndex.kinds() if self._flowIndex is not None else {})
+    
+    # Returns the version string a flow is fingerprinted with: the generator version and coverage options,
+    # plus the resolved kinds of the flows it calls, since those decide how its flow-refs are mocked.
+    def _flowRefVersion(self, summary : FlowSummary) -> str:
+        return (GENERATOR_VERSION + self._coverage + str(self._maxTestsPerFlow)
+                + repr([self._flowKinds.get(name) for name in summary.flowRefNames]))
+    
+    # Replace choice blocks in the mule TagList with a choice placeholder. A choice nested in another
+    # choice block is replaced along with it. summary describes the TagList, giving the spans of its choice
+    # blocks; it is built here if not given. Each block is cut out by slicing, so this is linear in the flow.
     # Can raise a TypeError if incorrect parameter types are provided.
-    def _replaceChoiceBlocks(self, muleTagList : TagList) -> TagList:
+    def _replaceChoiceBlocks(self, muleTagList : TagList, summary : FlowSummary = None) -> TagList:
         if not isinstance(muleTagList, TagList):
             raise TypeError('Invalid parameter passed to MuleLines _replaceChoiceBlocks')
-        inChoiceBlock = False
+        if summary is None:
+            summary = FlowSummary.fromPairs(muleTagList.iterPairs())
         
-        for pair in muleTagList.pairs():
-            # Determine the edges of the choice block, and remove everything in between.
-            if pair.getTag() == 'choice':
-                inChoiceBlock = True
-                
-            elif pair.getTag() == '/choice':
-                inChoiceBlock = False
-                pair.setTag('choicePlaceholder')
-                
-            if inChoiceBlock:
-                muleTagList.remove(pair)
-                
+        pairs = muleTagList.pairs()
+        outputPairs = []
+        position = 0
+        for start, end in _outerSpans(summary.choiceSpans(), 0, len(pairs)):  # Nested blocks go with them
+            outputPairs.extend(pairs[position:start])
+            # Use a new pair rather than retagging the choice, since its pairs are shared with _muleTagList
+            outputPairs.append(_sharedPair('choicePlaceholder', OrderedDict({'closeAtEnd': False})))
+            position = end + 1 if end is not None else len(pairs)
+        outputPairs.extend(pairs[position:])
+        
+        muleTagList.clear()
+        muleTagList.extend(outputPairs)
         return muleTagList
+
+# Returns the path of a split suite named after outputFilePath and partName, which is not in usedPaths.
+# The path is added to usedPaths.
+def _splitSuitePath(outputFilePath : str, partName : str, usedPaths : set) -> str:
+    basePath, extension = os.path.splitext(outputFilePath)
+    basePath += '-' + re.sub(r'[^A-Za-z0-9_.-]', '_', partName)
+    outputPath = basePath + (extension or '.xml')
+    duplicate = 1
+    while outputPath in usedPaths:
+        duplicate += 1
+        outputPath = basePath + '-' + str(duplicate) + (extension or '.xml')
+    usedPaths.add(outputPath)
+    return outputPath
+
+# Write the suite XML for the TagPairs in pairs to outputFilePath, unless the file already holds it.
+# Run on the threads of _writeSuiteFiles. Returns (true if the file was written, None), or (False, error)
+# if the file could not be written.
+def _writeSuiteFile(outputFilePath : str, pairs) -> (bool, OSError):
+    suite = io.StringIO()
+    SuiteWriter().write(pairs, suite)
+    try:
+        return (OutputFile.writeIfChanged(outputFilePath, suite.getvalue()), None)
+    except OSError as error:
+        return (False, error)
+
+# The MuleLines and flows used by _convertFlowInWorker, set in each worker process by _initializeConversionWorker.
+_workerMuleLines = None
+_workerFlows = []
+
+# Set the (TagListView, FlowSummary) tuples converted by _convertFlowInWorker in this process, and the
+# MuleLines converting them, which resolves flow-refs with flowKinds and has the given coverage options.
+def _initializeConversionWorker(flows : [], flowKinds : dict, coverage : str, maxTestsPerFlow : int) -> None:
+    global _workerMuleLines, _workerFlows
+    _workerMuleLines = MuleLines(coverage = coverage, maxTestsPerFlow = maxTestsPerFlow)
+    _workerMuleLines._flowKinds = flowKinds
+    _workerFlows = flows
+
+# Convert the flow at position in the worker's flows. Top level so it can be sent to worker processes.
+# Returns a (list of MUnit pairs, metrics from GenerationMetrics.toDict) tuple.
+def _convertFlowInWorker(position : int) -> tuple:
+    mule = _workerMuleLines
+    mule.metrics = GenerationMetrics()
+    flow, summary = _workerFlows[position]
+    mUnitPairs = mule._convertFlow(flow, summary).pairs()
+    return (mUnitPairs, mule.metrics.toDict())
+
+# Marks the cases of a choice block which have run out of alternatives, when taking them in turn.
+_NO_ALTERNATIVE = object()
+
+# Returns the (start, end) spans from spans, in document order, which start from start up to end and are not
+# nested in another of them. An end of None stands for a block which is never closed.
+def _outerSpans(spans : [], start : int, end : int) -> []:
+    outerSpans = []
+    position = start
+    for spanStart, spanEnd in spans:
+        if spanStart < position or spanStart >= end:  # Before the range, nested, or after the range
+            continue
+        outerSpans.append((spanStart, spanEnd))
+        position = spanEnd + 1 if spanEnd is not None else end
+    return outerSpans
+
+# Returns a TagPair whose attributes are shared with every other generated pair holding the same values.
+# Generated MUnit code repeats the same few attribute maps many times over, e.g. {'closeAtEnd': False}.
+def _sharedPair(tag : str, attributes : OrderedDict) -> TagPair:
+    return TagPair(tag, FrozenAttributes.share(attributes))
@@ -0,0 +1,209 @@
+import sys
+from collections import OrderedDict
+from xml.parsers import expat
+from FrozenAttributes import FrozenAttributes
+from TagList import TagList
+from TagPair import TagPair
+
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# An event-driven parser that maps Mule XML elements onto TagPairs using the stdlib expat engine.
+# Elements without children are stored as a single self closing pair (closeAtEnd = True), while
+# elements with children are stored as an opening pair followed by a '/tag' closing pair.
+# Pairs are collected while expat runs and added to the TagList once the document has been read, or
+# handed out a chunk at a time by iterFileChunks and iterStreamChunks, so huge configs need not be held at once.
+class MuleParser:
+    # Number of bytes handed to expat per read when parsing a stream.
+    READ_SIZE = 1 << 16
+
+    # Initialize a parser which appends every parsed TagPair to tagList. tagList may be None for a parser
+    # which is only used through iterFileChunks and iterStreamChunks.
+    # Can raise a TypeError if an incorrect type is given.
+    def __init__(self, tagList : TagList = None) -> None:
+        if tagList is not None and not isinstance(tagList, TagList):
+            raise TypeError('Non-TagList passed to MuleParser __init__')
+        self._tagList = tagList
+        self._pairs = []  # Pairs parsed from the current document
+        self._append = None
+        self._tagNames = {}  # Maps raw element names to their lowercase tags
+        self._closeTagNames = {}  # Maps raw element names to their '/tag' closing tags
+        self._openAttributes = FrozenAttributes.share(OrderedDict({'closeAtEnd': False}))
+        self._closedAttributes = FrozenAttributes.share(OrderedDict({'closeAtEnd': True}))
+        self._pendingTag = None  # Start tag waiting to find out whether it has any children
+        self._pendingAttributes = None
+        self.linesRead = 0  # Totals over every document parsed
+        self.pairsCreated = 0
+        self._newlines = 0  # Newlines in the data of the current document
+        self._lastChunk = None  # Last non-empty chunk of the current document, or None if it had no data
+
+    # Parse the Mule XML file at inputFilePath.
+    # Can raise a ValueError if the file is not well-formed XML.
+    def parseFile(self, inputFilePath : str) -> None:
+        with open(inputFilePath, 'rb') as file:
+            self.parseStream(file, inputFilePath)
+
+    # Parse Mule XML from a binary or text stream.
+    # Can raise a ValueError if the stream is not well-formed XML.
+    def parseStream(self, stream, sourceName : str = '<stream>') -> None:
+        parser = self._createParser()
+        try:
+            chunk = stream.read(self.READ_SIZE)
+            while chunk:
+                self._countLines(chunk)
+                parser.Parse(chunk, False)
+                chunk = stream.read(self.READ_SIZE)
+            parser.Parse(chunk, True)  # chunk is now empty; finish the document
+        except expat.ExpatError as error:
+            raise ValueError('Malformed Mule XML in ' + sourceName + ': ' + str(error))
+        self._finish()
+
+    # Parse Mule XML held in memory as a str or bytes object.
+    # Can raise a ValueError if the text is not well-formed XML.
+    def parseString(self, text, sourceName : str = '<string>') -> None:
+        parser = self._createParser()
+        self._countLines(text)
+        try:
+            parser.Parse(text, True)
+        except expat.ExpatError as error:
+            raise ValueError('Malformed Mule XML in ' + sourceName + ': ' + str(error))
+        self._finish()
+
+    # Parse the Mule XML file at inputFilePath, yielding lists of the TagPairs parsed from each block of
+    # READ_SIZE bytes instead of adding them to the TagList.
+    # Can raise a ValueError if the file is not well-formed XML.
+    def iterFileChunks(self, inputFilePath : str):
+        with open(inputFilePath, 'rb') as file:
+            yield from self.iterStreamChunks(file, inputFilePath)
+
+    # Parse Mule XML from a binary or text stream, yielding lists of the TagPairs parsed from each block of
+    # READ_SIZE bytes or characters instead of adding them to the TagList. Blocks which complete no pairs
+    # are skipped. Can raise a ValueError if the stream is not well-formed XML.
+    def iterStreamChunks(self, stream, sourceName : str = '<stream>'):
+        parser = self._createParser()
+        chunk = stream.read(self.READ_SIZE)
+        while True:
+            self._countLines(chunk)
+            try:
+                parser.Parse(chunk, not chunk)  # An empty chunk finishes the document
+            except expat.ExpatError as error:
+                raise ValueError('Malformed Mule XML in ' + sourceName + ': ' + str(error))
+            if self._pairs:
+                pairs = self._pairs
+                self.pairsCreated += len(pairs)
+                self._pairs = []
+                self._append = self._pairs.append
+                yield pairs
+            if not chunk:
+                break
+            chunk = stream.read(self.READ_SIZE)
+        self.linesRead += self._documentLines()
+        self._append = None
+
+    # Returns the lowercase tag of the root element of the XML file at inputFilePath, or None if the
+    # file is not XML. Only reads as far as the root element.
+    @staticmethod
+    def readRootTag(inputFilePath : str) -> str:
+        rootElement = MuleParser.readRootElement(inputFilePath)
+        return rootElement[0] if rootElement is not None else None
+
+    # Returns a (tag, attributes) tuple of the lowercase tag and the attribute dict of the root element of
+    # the XML file at inputFilePath, or None if the file is not XML. Only reads as far as the root element.
+    @staticmethod
+    def readRootElement(inputFilePath : str) -> tuple:
+        rootElements = []
+        
+        def startElement(name : str, attributes : dict) -> None:
+            rootElements.append((name.lower(), attributes))
+            raise _RootTagFound()
+        
+        parser = expat.ParserCreate()
+        parser.StartElementHandler = startElement
+        try:
+            with open(inputFilePath, 'rb') as file:
+                parser.ParseFile(file)
+        except _RootTagFound:
+            return rootElements[0]
+        except expat.ExpatError:
+            return None
+        return None
+
+    # Create an expat parser wired to this object's element handlers.
+    def _createParser(self):
+        self._pairs = []
+        self._append = self._pairs.append
+        self._pendingTag = None
+        self._pendingAttributes = None
+        self._newlines = 0
+        self._lastChunk = None
+        parser = expat.ParserCreate()
+        parser.StartElementHandler = self._startElement
+        parser.EndElementHandler = self._endElement
+        return parser
+
+    # Handle an opening tag. The pair is held back until the next event shows whether it is self closing.
+    # Expat hands over the attributes as a dict in document order.
+    def _startElement(self, name : str, attributes : dict) -> None:
+        if self._pendingTag is not None:  # The previous tag has a child, so it stays open
+            self._append(TagPair(self._pendingTag, self._pendingAttributes or self._openAttributes))
+
+        if attributes:
+            values = ''.join(attributes.values())
+            if '&' in values or '<' in values or '"' in values:
+                attributes = {key: _escapeAttribute(value) for key, value in attributes.items()}
+            attrDict = OrderedDict(attributes)
+            attrDict['closeAtEnd'] = False
+        else:  # Tags without attributes use the shared closeAtEnd maps
+            attrDict = None
+
+        tag = self._tagNames.get(name)
+        if tag is None:
+            tag = self._tagNames[name] = sys.intern(name.lower())
+            self._closeTagNames[name] = sys.intern('/' + tag)
+        self._pendingTag = tag
+        self._pendingAttributes = attrDict
+
+    # Handle a closing tag. An element with no children collapses into a single self closing pair.
+    def _endElement(self, name : str) -> None:
+        if self._pendingTag is not None:
+            attrDict = self._pendingAttributes
+            if attrDict is None:
+                attrDict = self._closedAttributes
+            else:
+                attrDict['closeAtEnd'] = True
+            self._append(TagPair(self._pendingTag, attrDict))
+            self._pendingTag = None
+        else:
+            self._append(TagPair(self._closeTagNames[name], self._openAttributes))
+
+    # Count the newlines in chunk, the next str or bytes block of the current document.
+    def _countLines(self, chunk) -> None:
+        if chunk:
+            self._newlines += chunk.count('\n' if isinstance(chunk, str) else b'\n')
+            self._lastChunk = chunk
+
+    # Returns the number of lines in the current document's data: one per newline, plus a last line
+    # which does not end with one. expat's line number would count an extra line after a final newline.
+    def _documentLines(self) -> int:
+        if self._lastChunk is None:
+            return 0
+        endsWithNewline = self._lastChunk.endswith('\n' if isinstance(self._lastChunk, str) else b'\n')
+        return self._newlines + (0 if endsWithNewline else 1)
+
+    # Move the parsed pairs into the TagList, and count the lines and pairs of the document.
+    def _finish(self) -> None:
+        self.linesRead += self._documentLines()
+        self.pairsCreated += len(self._pairs)
+        self._tagList.extend(self._pairs)
+        self._pairs = []
+        self._append = None
+
+# Raised to stop expat once readRootElement has seen the root element.
+class _RootTagFound(Exception):
+    pass
+
+# Expat decodes entities in attribute values; re-escape them so values can be written back verbatim.
+def _escapeAttribute(value : str) -> str:
+    return value.replace('&', '&amp;').replace('<', '&lt;').replace('"', '&quot;')
@@ -0,0 +1,108 @@
+import hashlib
+import locale
+import os
+import uuid
+
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# Writes generated text to files only when their content changed, so regenerating an unchanged suite
+# leaves its modification time alone and does not trigger downstream rebuilds.
+# New content replaces the old atomically, so readers never see a half-written file.
+class OutputFile:
+    CHUNK_SIZE = 1 << 16  # Bytes read at a time when hashing an existing file
+
+    # Write text to path unless the file already holds exactly that text. Returns true if the file was
+    # written, and false if it was left unchanged. text is encoded and its newlines translated the same way
+    # open(path, 'w') would; pass encoding to override the locale's encoding.
+    # Can raise an OSError if the file cannot be written.
+    @classmethod
+    def writeIfChanged(cls, path : str, text : str, encoding : str = None) -> bool:
+        if os.linesep != '\n':
+            text = text.replace('\n', os.linesep)
+        data = text.encode(encoding or locale.getpreferredencoding(False))
+        if cls.hasContent(path, data):
+            return False
+
+        # Write to a sibling file first, so the old content stays in place until the new content is complete
+        temporaryPath = cls.temporaryPathFor(path)
+        try:
+            with open(temporaryPath, 'xb') as file:
+                file.write(data)
+        except OSError as error:
+            cls._discard(temporaryPath)
+            raise cls.namedError(error, path) from error
+        cls._replace(temporaryPath, path)
+        return True
+
+    # Returns the path of a new temporary file next to path, for content to be written to before it
+    # is moved over path with replaceIfChanged.
+    @staticmethod
+    def temporaryPathFor(path : str) -> str:
+        return path + '.' + uuid.uuid4().hex + '.tmp'
+
+    # Move the finished file at temporaryPath over path, unless path already holds the same content, in which
+    # case the temporary file is deleted. Returns true if path was replaced, and false if it was left unchanged.
+    # Can raise an OSError if the file cannot be replaced.
+    @classmethod
+    def replaceIfChanged(cls, temporaryPath : str, path : str) -> bool:
+        try:
+            unchanged = (os.path.getsize(path) == os.path.getsize(temporaryPath)
+                         and cls._fileDigest(path) == cls._fileDigest(temporaryPath))
+        except OSError:  # Missing or unreadable; replace it
+            unchanged = False
+        if unchanged:
+            cls._discard(temporaryPath)
+            return False
+        cls._replace(temporaryPath, path)
+        return True
+
+    # Returns an OSError like error, but naming path, the file being written, instead of its temporary file,
+    # so messages point at a file the user knows about.
+    @staticmethod
+    def namedError(error : OSError, path : str) -> OSError:
+        if error.errno is None:
+            return error
+        return OSError(error.errno, error.strerror, path)  # Picks the matching subclass, e.g. PermissionError
+
+    # Returns true if the file at path holds exactly the bytes in data. Files of a different size are
+    # rejected without being read; otherwise the file is hashed in chunks and compared with data's hash.
+    @classmethod
+    def hasContent(cls, path : str, data : bytes) -> bool:
+        try:
+            if os.path.getsize(path) != len(data):
+                return False
+            return cls._fileDigest(path) == hashlib.sha1(data).digest()
+        except OSError:  # Missing or unreadable; write it
+            return False
+
+    # Returns the SHA-1 digest of the file at path, read in chunks.
+    @classmethod
+    def _fileDigest(cls, path : str) -> bytes:
+        fileHash = hashlib.sha1()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(cls.CHUNK_SIZE), b''):
+                fileHash.update(chunk)
+        return fileHash.digest()
+
+    # Move temporaryPath over path, keeping the permissions of the file it replaces.
+    # The temporary file is deleted if it cannot be moved, and the error raised names path.
+    @classmethod
+    def _replace(cls, temporaryPath : str, path : str) -> None:
+        try:
+            if os.path.exists(path):
+                os.chmod(temporaryPath, os.stat(path).st_mode & 0o7777)
+            os.replace(temporaryPath, path)
+        except OSError as error:
+            cls._discard(temporaryPath)
+            raise cls.namedError(error, path) from error
+
+    # Delete the file at temporaryPath, if it still exists.
+    @staticmethod
+    def _discard(temporaryPath : str) -> None:
+        try:
+            os.remove(temporaryPath)
+        except OSError:
+            pass
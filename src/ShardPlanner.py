@@ -0,0 +1,40 @@
+import heapq
+
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# Estimates how long the generated tests of each Mule flow take to run, and spreads flows across shards so
+# every shard has about the same estimated cost. Costs are relative units, where a plain test costs 1.
+# Tests which start servers or mock flow-refs take longer, and a flow with choice blocks has one test per branch.
+class ShardPlanner:
+    TEST_COST = 1.0
+    CONNECTOR_COSTS = {'db': 2.0, 'ftp': 2.0}  # Added to each test of a flow using the connector family
+    FLOW_REF_COST = 0.5  # Added to each test for every flow-ref it mocks or verifies
+
+    # Returns the estimated cost of running the testCount tests generated for the flow described by summary.
+    @classmethod
+    def flowCost(cls, testCount : int, summary) -> float:
+        testCost = cls.TEST_COST + cls.FLOW_REF_COST * len(summary.flowRefNames)
+        for family in summary.allConnectors:
+            testCost += cls.CONNECTOR_COSTS.get(family, 0.0)
+        return testCount * testCost
+
+    # Returns the positions in costs of the flows assigned to each of up to shards shards, in document order.
+    # Flows are placed from most to least costly, each on the shard with the lowest total cost so far.
+    # Shards which would hold no flows are left out, so fewer than shards lists are returned for small configs.
+    # Can raise a TypeError if shards is not an int above 0.
+    @classmethod
+    def plan(cls, costs : [], shards : int) -> []:
+        if not isinstance(shards, int) or shards < 1:
+            raise TypeError('shards passed to ShardPlanner plan must be an int above 0')
+
+        loads = [(0.0, shard) for shard in range(min(shards, len(costs)))]  # (total cost, shard) heap
+        groups = [[] for shard in loads]
+        for position in sorted(range(len(costs)), key = lambda position: (-costs[position], position)):
+            load, shard = heapq.heappop(loads)
+            groups[shard].append(position)
+            heapq.heappush(loads, (load + costs[position], shard))
+
+        return [sorted(group) for group in groups]
@@ -0,0 +1,166 @@
+import os
+import time
+from BatchGenerator import BatchGenerator, isMuleConfig
+from CoveragePlanner import CoveragePlanner
+from FlowCache import FlowCache
+from FlowIndex import FlowIndex
+from MuleLines import MuleLines
+
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# Keeps MUnit suites up to date while Mule configs are edited. Input files are polled for changes;
+# a burst of saves is debounced into one regeneration, and a suite is only rewritten when the flows
+# (or spring internals) of its config actually changed. Flows are converted through a shared
+# FlowCache, so only the flows that changed are converted again.
+# Flow-refs are resolved through a FlowIndex of the watched projects; when a change renames a flow or
+# turns it into a sub-flow, every suite is checked again, since any of them may call it.
+class SuiteWatcher:
+    DEBOUNCE_SECONDS = 0.3
+
+    # Initialize a watcher polling every interval seconds.
+    # flowCache, if given, is used for every regeneration; otherwise an in-memory cache is created.
+    # flowIndex, if given, is kept up to date with the indexed projects and saved as it changes.
+    # coverage and maxTestsPerFlow choose the tests of flows with several or nested choice blocks; see MuleLines.
+    def __init__(self, flowCache : FlowCache = None, interval : float = 0.5, flowIndex : FlowIndex = None,
+                 coverage : str = CoveragePlanner.DEFAULT_STRATEGY,
+                 maxTestsPerFlow : int = CoveragePlanner.DEFAULT_MAX_TESTS) -> None:
+        self._flowCache = flowCache if flowCache is not None else FlowCache()
+        self._flowIndex = flowIndex if flowIndex is not None else FlowIndex()
+        self._coverage = coverage
+        self._maxTestsPerFlow = maxTestsPerFlow
+        self._interval = interval
+        self._files = {}  # Input file path -> output file path
+        self._batches = []  # BatchGenerators whose folders are rescanned for new configs
+        self._projects = []  # BatchGenerators finding the configs which are indexed
+        self._fileStats = {}  # Input file path -> (mtime, size) when last seen
+        self._suiteFingerprints = {}  # Input file path -> fingerprint of the suite last written
+        self._writtenFiles = set()  # Absolute paths of every suite written, which are never watched as inputs
+
+    # Watch a single Mule config, writing its suite to outputFilePath.
+    def watchFile(self, inputFilePath : str, outputFilePath : str) -> None:
+        self._files[inputFilePath] = outputFilePath
+
+    # Watch every Mule config found by batch, including configs added later.
+    def watchFolder(self, batch : BatchGenerator) -> None:
+        self._batches.append(batch)
+        self._projects.append(batch)
+
+    # Resolve flow-refs against every Mule config found by batch, without generating suites for them.
+    def indexFolder(self, batch : BatchGenerator) -> None:
+        self._projects.append(batch)
+
+    # Generate every suite once, then regenerate suites as their configs change until interrupted.
+    def run(self) -> None:
+        self._regenerateAll(self._pollChanges())
+        print('Watching for changes; press Ctrl+C to stop.')
+
+        try:
+            while True:
+                time.sleep(self._interval)
+                changes = self._pollChanges()
+                if not changes:
+                    continue
+
+                # Wait for the burst of saves to settle before regenerating
+                time.sleep(self.DEBOUNCE_SECONDS)
+                moreChanges = self._pollChanges()
+                while moreChanges:
+                    changes.update(moreChanges)
+                    time.sleep(self.DEBOUNCE_SECONDS)
+                    moreChanges = self._pollChanges()
+                self._regenerateAll(changes)
+        except KeyboardInterrupt:
+            print('Stopped watching.')
+        finally:
+            self._flowCache.prune()
+
+    # Regenerate the suite for inputFilePath if its flows changed since it was last written.
+    # Returns true if the suite was written, and false if it was unchanged or generation failed.
+    def regenerate(self, inputFilePath : str, outputFilePath : str) -> bool:
+        startTime = time.time()
+        fileName = os.path.basename(inputFilePath)
+        try:
+            # A config outside of any project is not indexed against anything else, as in a one-shot run
+            flowIndex = self._flowIndex if self._projects else None
+            mule = MuleLines(self._flowCache, flowIndex, self._coverage, self._maxTestsPerFlow)
+            mule.parseMuleFileLines(inputFilePath)
+            suiteFingerprint = mule.suiteFingerprint()
+            
+            if (self._suiteFingerprints.get(inputFilePath) == suiteFingerprint
+                and os.path.isfile(outputFilePath)):
+                print('  ' + fileName + ': no flow changes (%.3fs)' % (time.time() - startTime))
+                return False
+            
+            outputFolder = os.path.dirname(outputFilePath)
+            if outputFolder:
+                os.makedirs(outputFolder, exist_ok = True)
+            mule.createMUnitTests()
+            self._writtenFiles.add(os.path.abspath(outputFilePath))
+            written = mule.createMUnitSuiteFile(outputFilePath)
+        except Exception as exception:  # Keep watching; the file may have been saved half-edited
+            print('  ' + fileName + ' FAILED: ' + type(exception).__name__ + ': ' + str(exception))
+            return False
+
+        if not written:
+            if mule.unchangedFiles:  # Regenerated, but identical to the suite already on disk
+                self._suiteFingerprints[inputFilePath] = suiteFingerprint
+                print('  ' + fileName + ': suite unchanged (%.3fs)' % (time.time() - startTime))
+            return False
+        
+        self._suiteFingerprints[inputFilePath] = suiteFingerprint
+        print('  ' + fileName + ' -> ' + outputFilePath + ' (%.3fs)' % (time.time() - startTime))
+        return True
+
+    # Regenerate the suites of every changed input file, and report how long it took.
+    def _regenerateAll(self, changedFiles : set) -> None:
+        startTime = time.time()
+        targets = self._targets()
+        written = 0
+        
+        # A flow added, removed or changed in kind can change how any suite mocks its flow-refs.
+        # Without a project there is nothing to index, and the shared index on disk is left alone.
+        if self._projects:
+            projectConfigs = [config for project in self._projects for config in project.findMuleConfigs()]
+            if self._flowIndex.update(projectConfigs):
+                changedFiles = set(targets)
+            self._flowIndex.save()
+        
+        for inputFilePath in sorted(changedFiles):
+            # Files found by a folder glob are only known to be Mule configs once they are read
+            if inputFilePath not in self._files and not isMuleConfig(inputFilePath):
+                continue
+            if self.regenerate(inputFilePath, targets[inputFilePath]):
+                written += 1
+        
+        print('Regenerated ' + str(written) + ' suite(s) in %.3fs' % (time.time() - startTime))
+
+    # Returns a dict of every watched input file path to its output file path.
+    # Folder entries are every file matching the folder's glob, whether or not it is a Mule config, except for
+    # the suites this watcher writes, so a suite written inside a watched folder is not picked up as a new input.
+    def _targets(self) -> dict:
+        targets = dict(self._files)
+        outputFiles = self._writtenFiles.union(os.path.abspath(path) for path in self._files.values())
+        for batch in self._batches:
+            for inputFilePath in batch.findCandidateFiles():
+                if os.path.abspath(inputFilePath) not in outputFiles:
+                    targets.setdefault(inputFilePath, batch.outputPathFor(inputFilePath))
+        return targets
+
+    # Returns the set of watched input files which are new or modified since the last poll.
+    def _pollChanges(self) -> set:
+        changes = set()
+        for inputFilePath in self._targets():
+            try:
+                stat = os.stat(inputFilePath)
+            except OSError:  # Deleted, or mid-save
+                self._fileStats.pop(inputFilePath, None)
+                continue
+
+            fileStat = (stat.st_mtime_ns, stat.st_size)
+            if self._fileStats.get(inputFilePath) != fileStat:
+                self._fileStats[inputFilePath] = fileStat
+                changes.add(inputFilePath)
+        return changes
@@ -0,0 +1,114 @@
+from FrozenAttributes import FrozenAttributes
+
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# Serializes a sequence of MUnit TagPairs to suite XML.
+# render() is a generator of output chunks, one per pair; write() gathers those chunks into large
+# buffered writes to any text stream (a file, sys.stdout, io.StringIO, ...).
+# Indentation is handled dynamically, by tracking which of the preceding tags were self closing,
+# and which were left open.
+class SuiteWriter:
+    BUFFER_SIZE = 1 << 16  # Characters gathered before each write to the stream
+    XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n\n'
+
+    # Closing tags followed by a blank line for readability.
+    SPACED_CLOSING_TAGS = frozenset(('/munit:test', '/spring:beans', '/munit:before-suite', '/munit:after-suite'))
+
+    # Initialize a writer which hands text to its stream in chunks of about bufferSize characters.
+    def __init__(self, bufferSize : int = BUFFER_SIZE) -> None:
+        self._bufferSize = bufferSize
+        self._attributeText = {}  # id(FrozenAttributes) -> (attributes, rendered attribute text)
+
+    # Generate the XML for the TagPairs in pairs, as a sequence of str chunks.
+    # munit:test names are numbered, counting up while consecutive tests share the same name.
+    def render(self, pairs):
+        yield self.XML_DECLARATION
+
+        indents = ['']  # indents[depth] is the indentation for tags at that depth
+        tagDepth = 0
+        testNumber = 1
+        currentFlow = ""
+        spacedClosingTags = self.SPACED_CLOSING_TAGS
+
+        for pair in pairs:
+            tag = pair.getTag()
+            attributes = pair.getAttributes()
+            closeAtEnd = attributes.get('closeAtEnd')
+
+            if tag == 'munit:test':  # Create a test number for flows with multiple test cases
+                testName = attributes.get('name')
+                if currentFlow != testName:
+                    currentFlow = testName
+                    testNumber = 1
+                else:
+                    testNumber += 1
+                attributeText = self._renderTestAttributes(attributes, testNumber)
+            else:
+                attributeText = self._renderAttributes(attributes)
+
+            # Add closing braces depending on the tag type
+            ending = '/>\n' if closeAtEnd else '>\n'
+            if tag in spacedClosingTags:  # Insert an additional newline for readability
+                ending += '\n'
+
+            # Determine the indentation of current XML tag based on when blocks close
+            if tag[0] == '/':
+                tagDepth -= 1
+                yield (indents[tagDepth] if tagDepth > 0 else '') + '<' + tag + attributeText + ending
+            else:
+                yield (indents[tagDepth] if tagDepth > 0 else '') + '<' + tag + attributeText + ending
+                if not closeAtEnd:
+                    tagDepth += 1
+                    if tagDepth == len(indents):
+                        indents.append('\t' * tagDepth)
+
+    # Write the XML for the TagPairs in pairs to a text stream, using large buffered writes.
+    # Returns the number of characters written.
+    def write(self, pairs, stream) -> int:
+        buffer = []
+        bufferedLength = 0
+        totalLength = 0
+        bufferSize = self._bufferSize
+
+        for chunk in self.render(pairs):
+            buffer.append(chunk)
+            bufferedLength += len(chunk)
+            if bufferedLength >= bufferSize:
+                stream.write(''.join(buffer))
+                totalLength += bufferedLength
+                buffer.clear()
+                bufferedLength = 0
+
+        if buffer:
+            stream.write(''.join(buffer))
+            totalLength += bufferedLength
+        return totalLength
+
+    # Returns the ' name="value"' text for every attribute except closeAtEnd.
+    # Text for shared FrozenAttributes is rendered once and reused.
+    def _renderAttributes(self, attributes) -> str:
+        if not isinstance(attributes, FrozenAttributes):
+            return ''.join([' ' + name + '="' + value + '"' for name, value in attributes.items()
+                            if name != 'closeAtEnd'])
+
+        cached = self._attributeText.get(id(attributes))
+        if cached is not None and cached[0] is attributes:
+            return cached[1]
+
+        attributeText = ''.join([' ' + name + '="' + value + '"' for name, value in attributes.items()
+                                 if name != 'closeAtEnd'])
+        self._attributeText[id(attributes)] = (attributes, attributeText)  # Holding attributes keeps its id unique
+        return attributeText
+
+    # Returns the attribute text for a munit:test tag, with testNumber appended to its name.
+    def _renderTestAttributes(self, attributes, testNumber : int) -> str:
+        attributeText = ''
+        for name, value in attributes.items():
+            if name == 'name':
+                attributeText += ' ' + name + '="' + value + str(testNumber) + '"'
+            elif name != 'closeAtEnd':
+                attributeText += ' ' + name + '="' + value + '"'
+        return attributeText
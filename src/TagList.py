@@ -1,33 +1,49 @@
+import hashlib
+from bisect import bisect_left, insort
+from TagListView import TagListView
 from TagPair import TagPair
 
 ###########################
 # Author: Benjamin East
-# Last Updated: 06/25/2017
+# Last Updated: 10/18/2026
 ###########################
         
 # A custom class to act as an ordered list of XML tags, paired with an OrderedDict of the
 # attributes of those XML tags.
+# An index of tag -> sorted positions is kept alongside the list, so tag lookups do not scan it.
+# The index assumes pairs are not retagged in place; remove the pair and insert a new one instead.
+# A fingerprint of the whole list is cached once computed, so TagLists hash and compare in O(1) until changed.
+# Likewise, pairs must not be changed in place once the TagList has been fingerprinted.
 class TagList:
     # Initialize as an empty list.
     def __init__(self) -> None:
         self._list = [] 
+        self._positions = {}  # Maps each tag to the sorted list of positions holding it
+        self._fingerprint = None  # Cleared whenever the list changes
     
     # Delete the TagList.
     def __del__(self) -> None:
         del self._list
+        del self._positions
         
     # Returns true if self == other and false otherwise.
     def __eq__(self, other) -> bool:
+        if self is other:
+            return True
         if not isinstance(other, TagList):
             return False
         if len(self._list) != len(other._list):
             return False
-        for i in range(0, len(self._list)):
-            if self._list[i] != other._list[i]:
-                return False
-            
-        return True    
+        return self.fingerprint() == other.fingerprint()
+    
+    # Returns a hash of the TagList, so equal TagLists can be found in sets and dicts.
+    def __hash__(self) -> int:
+        return hash(self.fingerprint())
     
+    # Returns the number of TagPairs in the TagList.
+    def __len__(self) -> int:
+        return len(self._list)
+
     # Returns true if self != other and false otherwise.
     def __ne__(self, other) -> bool:
         return not self.__eq__(other)
@@ -45,63 +61,108 @@ class TagList:
     # Can raise a TypeError if an incorrect type is given.
     def append(self, pair : TagPair) -> None:
         if isinstance(pair, TagPair):
+            self._positions.setdefault(pair.getTag(), []).append(len(self._list))
             self._list.append(pair)
+            self._fingerprint = None
         else:
             raise TypeError('Non-TagPair passed to TagList append')
     
+    # Appends every TagPair in pairs to the end of the TagList.
+    # Can raise a TypeError if an incorrect type is given; the TagList is unchanged in that case.
+    def extend(self, pairs : []) -> None:
+        pairs = list(pairs)
+        for pair in pairs:
+            if not isinstance(pair, TagPair):
+                raise TypeError('Non-TagPair passed to TagList extend')
+        
+        position = len(self._list)
+        positions = self._positions
+        for pair in pairs:
+            tagPositions = positions.get(pair.getTag())
+            if tagPositions is None:
+                positions[pair.getTag()] = [position]
+            else:
+                tagPositions.append(position)
+            position += 1
+        self._list.extend(pairs)
+        self._fingerprint = None
+
     # Removes everything from the TagList.
     def clear(self) -> None:
         self._list.clear()
+        self._positions.clear()
+        self._fingerprint = None
 
     # Returns true if the targetPair is present in the TagList, and false otherwise.
     # Can raise a TypeError if an incorrect type is given.
     def contains(self, targetPair : TagPair) -> bool:
         if isinstance(targetPair, TagPair):
-            if targetPair in self._list:
-                return True
-            else:
-                return False
+            return self.index(targetPair) is not None
         else:
             raise TypeError('Non-TagPair passed to TagList contains')
     
     # Returns true if a TagPair with the tag is in the TagList, and false otherwise.
     def containsTag(self, tag : str) -> bool:
-        for pair in self._list:
-            if pair.getTag() == tag:
-                return True
-            
-        return False
+        return tag in self._positions
         
+    # Returns a new TagList holding the TagPairs in pairs, e.g. a mutable copy of a TagListView.
+    # Can raise a TypeError if an incorrect type is given.
+    @classmethod
+    def fromPairs(cls, pairs):
+        outputList = cls()
+        outputList.extend(pairs)
+        return outputList
+
     # Returns an exact copy of the list that it was provided,  
     def copy(self):
         outputList = TagList()
-        for pair in self._list:
-            outputList.append(pair)
+        outputList._list = self._list[:]
+        outputList._positions = {tag: positions[:] for tag, positions in self._positions.items()}
+        outputList._fingerprint = self._fingerprint
             
         return outputList
+
+    # Returns a digest of the TagPairs in the TagList, in order, built from their fingerprints.
+    # Equal TagLists have equal fingerprints, and TagLists which differ have different ones but for
+    # a negligible chance of collision.
+    def fingerprint(self) -> bytes:
+        if self._fingerprint is None:
+            pairFingerprints = b''.join([pair.fingerprint() for pair in self._list])
+            self._fingerprint = hashlib.blake2b(pairFingerprints, digest_size = TagPair.FINGERPRINT_SIZE).digest()
+        return self._fingerprint
                         
     # Returns the first pair with a matching tag in the TagList
     def getPair(self, tag : str) -> TagPair:
-        for pair in self._list:
-            if pair.getTag() == tag:
-                return pair
-            
-        return None
+        positions = self._positions.get(tag)
+        if positions is None:
+            return None
+        return self._list[positions[0]]
 
     # Returns the index of the first occurence of targetPair in the TagList or None if not present.
+    # Only pairs sharing the tag of targetPair are compared.
     def index(self, targetPair : TagPair) -> int:
-        if not targetPair in self._list:
+        if not isinstance(targetPair, TagPair):
             return None
         
-        for pair in self._list:
-            if pair == targetPair:
-                return self._list.index(pair)
+        for position in self._positions.get(targetPair.getTag(), ()):
+            if self._list[position] == targetPair:
+                return position
+        return None
 
     # Inserts the TagPair value at the provided index in the list.
     # Can raise a TypeError if an incorrect type is given.
     def insertAtIndex(self, index : int, value : TagPair) -> None:
         if isinstance(index, int) and isinstance(value, TagPair):
+            # Clamp the index the same way list.insert does
+            if index < 0:
+                index = max(0, len(self._list) + index)
+            elif index > len(self._list):
+                index = len(self._list)
+            
+            self._shiftPositions(index, 1)
+            insort(self._positions.setdefault(value.getTag(), []), index)
             self._list.insert(index, value)
+            self._fingerprint = None
         else:
             raise TypeError('Invalid types passed to TagList insertAtIndex')
     
@@ -111,22 +172,52 @@ class TagList:
     
     # Return all of the XML tag, OrderedDict pairs
     def pairs(self) -> []:
-        return [x for x in self._list]
+        return self._list[:]
+
+    # Returns an iterator over the TagPairs in the TagList, without copying them.
+    # The TagList must not be changed while the iterator is in use.
+    def iterPairs(self):
+        return iter(self._list)
 
     # Remove a pair from the TagList.
     # This will remove the first occurence that matches the pair.
     def remove(self, targetPair : TagPair) -> None:
-        if not targetPair in self._list or not isinstance(targetPair, TagPair):
+        index = self.index(targetPair)
+        if index is None:
             return
-        self._list.remove(targetPair)
+        
+        self._removePosition(targetPair.getTag(), index)
+        del self._list[index]
+        self._shiftPositions(index, -1)
+        self._fingerprint = None
 
     # Removes all occurences of targetPair from the TagList.
     def removeAll(self, targetPair : TagPair) -> None:
-        if not targetPair in self._list or not isinstance(targetPair, TagPair):
+        if self.index(targetPair) is None:
             return
-        while targetPair in self._list:
-            self._list.remove(targetPair)
+        
+        pairs = [pair for pair in self._list if pair != targetPair]
+        self.clear()
+        self.extend(pairs)
 
     # Return a list of the XML tags in the TagList    
     def tags(self) -> []:
         return [x.getTag() for x in self._list]
+
+    # Returns a read-only TagListView of the pairs from start up to end, sharing the TagList's pairs
+    # rather than copying them. The TagList must not be changed while the view is in use.
+    def view(self, start : int = 0, end : int = None) -> TagListView:
+        return TagListView(self._list, start, end)
+
+    # Removes position from the index entry for tag, dropping the entry once it is empty.
+    def _removePosition(self, tag : str, position : int) -> None:
+        positions = self._positions[tag]
+        del positions[bisect_left(positions, position)]
+        if not positions:
+            del self._positions[tag]
+
+    # Adds offset to every indexed position at or after start.
+    def _shiftPositions(self, start : int, offset : int) -> None:
+        for positions in self._positions.values():
+            for i in range(bisect_left(positions, start), len(positions)):
+                positions[i] += offset
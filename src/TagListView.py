@@ -0,0 +1,78 @@
+###########################
+# Author: Benjamin East
+# Last Updated: 10/18/2026
+###########################
+
+# A read-only view of the TagPairs from start up to end of a list shared with a TagList, such as one flow
+# of a parsed Mule config. Views hold only their offsets, so isolating every flow and choice branch of a
+# config costs memory proportional to the number of flows, not to the size of the document.
+# The backing list must not be changed while the view is in use; use TagList.fromPairs for a mutable copy.
+class TagListView:
+    # Initialize a view of pairs[start:end]. end defaults to the end of pairs.
+    def __init__(self, pairs : [], start : int = 0, end : int = None) -> None:
+        self._pairs = pairs
+        self._start = start
+        self._end = len(pairs) if end is None else end
+
+    # Returns true if other is a view of the same TagPairs, and false otherwise.
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TagListView) or len(self) != len(other):
+            return False
+        for pair, otherPair in zip(self.iterPairs(), other.iterPairs()):
+            if pair != otherPair:
+                return False
+        return True
+
+    # Returns an iterator over the TagPairs in the view, so a view can be read wherever a list of pairs is.
+    def __iter__(self):
+        return self.iterPairs()
+
+    # Returns the number of TagPairs in the view.
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    # Returns true if self != other and false otherwise.
+    def __ne__(self, other) -> bool:
+        return not self.__eq__(other)
+
+    # Returns a string output for the view.
+    def __str__(self) -> str:
+        output = '--- TagListView ---\n'
+        for pair in self.iterPairs():
+            output += str(pair) + '\n'
+        output += '--------------------'
+
+        return output
+
+    # Returns true if a TagPair with the tag is in the view, and false otherwise.
+    def containsTag(self, tag : str) -> bool:
+        return self.getPair(tag) is not None
+
+    # Returns the first pair with a matching tag in the view, or None if there is none.
+    def getPair(self, tag : str):
+        for pair in self.iterPairs():
+            if pair.getTag() == tag:
+                return pair
+        return None
+
+    # Returns true if the view is empty, and false otherwise.
+    def isEmpty(self) -> bool:
+        return self._end <= self._start
+
+    # Returns an iterator over the TagPairs in the view, without copying them. The pairs are looked up by
+    # position, since islice would step through every pair before the view's start.
+    def iterPairs(self):
+        return map(self._pairs.__getitem__, range(self._start, self._end))
+
+    # Returns a list of the TagPairs in the view.
+    def pairs(self) -> []:
+        return self._pairs[self._start:self._end]
+
+    # Return a list of the XML tags in the view.
+    def tags(self) -> []:
+        return [pair.getTag() for pair in self.iterPairs()]
+
+    # Returns a view of the TagPairs from start up to end of this view, counted from the start of this view.
+    def view(self, start : int = 0, end : int = None):
+        end = len(self) if end is None else min(end, len(self))
+        return TagListView(self._pairs, self._start + start, self._start + end)
@@ -1,52 +1,76 @@
+import hashlib
+import sys
 from collections import OrderedDict
+from FrozenAttributes import FrozenAttributes
 
 ###########################
 # Author: Benjamin East
-# Last Updated: 06/25/2017
+# Last Updated: 10/18/2026
 ###########################
 
 # A custom class of (str, OrderedDict) pairs; made to map XML tags and attributes to.
+# Pairs are slotted and their tags interned, since large configs create hundreds of thousands of them.
+# Attributes may be a FrozenAttributes shared with other pairs; the setters copy it before changing it.
+# A pair's fingerprint is computed on first use and cached, so pairs hash and compare in O(1) from then on.
+# The setters clear it; attributes must not be changed through getAttributes once a pair is fingerprinted.
 class TagPair:
+    __slots__ = ('_tag', '_attributes', '_fingerprint')
+    FINGERPRINT_SIZE = 16  # Bytes in a fingerprint
+    
     # Initialize a new str, OrderedDict TagPair.
     # Can raise a TypeError if an incorrect type is given.
     def __init__(self, tag : str, attributes : OrderedDict) -> None:
         if isinstance(tag, str) and isinstance(attributes, OrderedDict):
-            self._tag = tag
+            self._tag = sys.intern(tag)
             self._attributes = attributes
+            self._fingerprint = None
         else:
             raise TypeError('Invalid types passed to TagPair __init__')
     
-    # Delete the TagPair.
-    def __del__(self) -> None:
-        del self._tag
-        del self._attributes
-    
     # Returns true if other == self, and false otherwise.
+    # Pairs are equal if they have the same tag and attributes, in any order.
     def __eq__(self, other) -> bool:
+        if self is other:
+            return True
         if not isinstance(other, TagPair):
             return False
-        if self._tag != other.getTag():
-            return False
-        if len(self._attributes) != len(other.getAttributes()):
-            return False
-        
-        for key in self._attributes.keys():
-            if not key in other.getAttributes():
-                return False
-            else:
-                if self._attributes.get(key) != other.getAttributes().get(key):
-                    return False
-                
-        return True
+        return self.fingerprint() == other.fingerprint()
+    
+    # Returns a hash of the pair, so equal pairs can be found in sets and dicts.
+    def __hash__(self) -> int:
+        return hash(self.fingerprint())
     
     # Returns true if other != self and false otherwise.    
     def __ne__(self, other) -> bool: 
         return not self.__eq__(other)
                 
+    # Rebuild through __init__ when pickled, e.g. when flows are sent to worker processes; this is much
+    # faster than pickling the slots. The fingerprint is left out and computed again when needed.
+    def __reduce__(self):
+        return (TagPair, (self._tag, self._attributes))
+
     # Return a string representation of the TagPair.
     def __str__(self) -> str:
         return 'TagPair\t (' + str(self._tag) + ' : ' + str(self._attributes) + ')'
 
+    # Returns a digest of the pair's tag and attributes, ignoring attribute order. Equal pairs have equal
+    # fingerprints, and pairs which differ have different ones but for a negligible chance of collision.
+    def fingerprint(self) -> bytes:
+        fingerprint = self._fingerprint
+        if fingerprint is not None:
+            return fingerprint
+        
+        attributes = self._attributes
+        if isinstance(attributes, FrozenAttributes):  # Shared, so computed once per tag
+            fingerprints = attributes.pairFingerprints()
+            fingerprint = fingerprints.get(self._tag)
+            if fingerprint is None:
+                fingerprint = fingerprints[self._tag] = self._computeFingerprint()
+        else:
+            fingerprint = self._computeFingerprint()
+        self._fingerprint = fingerprint
+        return fingerprint
+
     # Returns the tag of this pair.
     def getTag(self) -> str:
         return self._tag
@@ -55,11 +79,13 @@ class TagPair:
     # Can raise a TypeError if an incorrect type is given.
     def setTag(self, newTag : str) -> None:
         if isinstance(newTag, str):
-            self._tag = newTag
+            self._tag = sys.intern(newTag)
+            self._fingerprint = None
         else:
             raise TypeError('Non-str passed to TagPair setTag')
     
     # Returns the attributes OrderedDict of this pair.
+    # This may be a read-only FrozenAttributes; use copy() to get a mutable OrderedDict.
     def getAttributes(self) -> OrderedDict:
         return self._attributes
 
@@ -68,6 +94,7 @@ class TagPair:
     def setAttributes(self, newAttributes : OrderedDict) -> None:
         if isinstance(newAttributes, OrderedDict):
             self._attributes = newAttributes
+            self._fingerprint = None
         else:
             raise TypeError('Non-OrderedDict passed to TagPair setAttributes')
     
@@ -83,11 +110,24 @@ class TagPair:
     # Can raise a TypeError if an incorrect type is given.
     def setAttribute(self, attributeName : str, attributeValue : str) -> None:
         if isinstance(attributeName, str) and isinstance(attributeValue, str):
-            self._attributes[attributeName] = attributeValue
+            self._ownAttributes()[attributeName] = attributeValue
         else:
             raise TypeError('Invalid parameter types passed to TagPair setAttribute')
 
     # Removes an attribute from the _attributes OrderedDict if a key of attributeName exists.
     def removeAttribute(self, attributeName : str) -> None:
         if attributeName in self._attributes:
-            self._attributes.pop(attributeName, None)
+            self._ownAttributes().pop(attributeName, None)
+
+    # Returns a digest of the tag and the attributes sorted by name.
+    def _computeFingerprint(self) -> bytes:
+        canonical = repr((self._tag, sorted(self._attributes.items())))
+        return hashlib.blake2b(canonical.encode('utf-8'), digest_size = self.FINGERPRINT_SIZE).digest()
+
+    # Returns a mutable attributes OrderedDict, copying a shared FrozenAttributes first.
+    # The pair is about to change, so its fingerprint is cleared.
+    def _ownAttributes(self) -> OrderedDict:
+        self._fingerprint = None
+        if isinstance(self._attributes, FrozenAttributes):
+            self._attributes = self._attributes.copy()
+        return self._attributes